@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Local HTTP answer service
+Serves the ChatEngine over HTTP/1.1 (keep-alive, JSON in and out) so the Node
+server and other local tools share one answer implementation.
+
+    python answer_service.py --port 8765 --workers 4 --pool process
+
+Endpoints:
+    GET  /health        -> {"status": "OK", "knowledge": "v1 (...)", "cache": {...}}
+    POST /answer        {"domain": "finance", "message": "..."} -> {"response": "..."}
+    POST /answer/batch  {"requests": [{"domain": "...", "message": "..."}, ...]} -> {"responses": [...]}
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+
+from chat_engine import (ChatEngine, content_version, knowledge_version, render_response, resolve_message,
+                         set_knowledge, watch_knowledge)
+from knowledge_store import load_knowledge
+from metrics import METRICS, PrometheusExporter
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 8 * 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 30.0
+
+# Engine used by pool workers for batch requests, created on first use per worker
+_worker_engine = None
+
+# Set in process pool workers, which follow the service's knowledge version instead of watching the content
+_process_worker = False
+
+
+def _start_process_worker():
+    global _process_worker
+    _process_worker = True
+
+
+def _catch_up(version):
+    """Load the knowledge content in a process pool worker still on an older version than the request's
+
+    Thread pool workers share the service's live version and never reload.
+    """
+    if _process_worker and content_version() < version:
+        set_knowledge(load_knowledge())
+
+
+def _resolve(version, domain, message):
+    _catch_up(version)
+    return resolve_message(domain, message)
+
+
+def _answer_batch(version, requests):
+    global _worker_engine
+    _catch_up(version)
+    if _worker_engine is None:
+        _worker_engine = ChatEngine()
+    return _worker_engine.answer_batch(requests)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _parse_request(item):
+    if not isinstance(item, dict):
+        raise BadRequest('Each request must be a JSON object')
+    domain = item.get('domain', 'general')
+    message = item.get('message')
+    if not isinstance(domain, str) or not isinstance(message, str) or not message.strip():
+        raise BadRequest('Message is required')
+    return domain, message
+
+
+class AnswerService:
+    """Routes HTTP requests to the engine, running answers on a worker pool"""
+
+    def __init__(self, workers=4, pool='thread'):
+        # The response cache lives in this process, so hits never leave the event loop
+        self.engine = ChatEngine()
+        if pool == 'process':
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_start_process_worker)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def answer(self, domain, message):
+        key = (knowledge_version(), domain, message)
+        response = self.engine.cache.get(key)
+        if response is None:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self.executor, _resolve, content_version(), domain, message)
+            self.engine.cache.put(key, response)
+        return render_response(*response)
+
+    async def answer_batch(self, requests):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _answer_batch, content_version(), requests)
+
+    async def dispatch(self, method, path, body):
+        """Return (status, JSON-serializable payload) for one request"""
+        if path == '/health':
+            if method != 'GET':
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use GET'}
+            return HTTPStatus.OK, {'status': 'OK', 'knowledge': knowledge_version(), 'cache': self.engine.cache.stats()}
+        if path not in ('/answer', '/answer/batch'):
+            return HTTPStatus.NOT_FOUND, {'error': 'Not found'}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use POST'}
+
+        try:
+            payload = json.loads(body or b'null')
+            if path == '/answer':
+                domain, message = _parse_request(payload)
+                return HTTPStatus.OK, {'success': True, 'response': await self.answer(domain, message)}
+            if not isinstance(payload, dict) or not isinstance(payload.get('requests'), list):
+                raise BadRequest('Body must contain a "requests" list')
+            requests = [_parse_request(item) for item in payload['requests']]
+            return HTTPStatus.OK, {'success': True, 'responses': await self.answer_batch(requests)}
+        except (ValueError, BadRequest) as error:
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'Malformed request line'}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'Invalid Content-Length'}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'Request body too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, target.split('?', 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"🚀 Zeno answer service running on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Zeno answer engine over local HTTP')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=4, help='size of the answer worker pool')
+    parser.add_argument('--pool', choices=('thread', 'process'), default='thread',
+                        help='process pools answer in parallel across cores')
+    parser.add_argument('--metrics-file', help='periodically write stage latencies here in Prometheus text format')
+    parser.add_argument('--metrics-interval', type=float, default=15.0)
+    parser.add_argument('--knowledge-interval', type=float, default=2.0,
+                        help='seconds between checks of the knowledge content for edits (0 disables reloading)')
+    args = parser.parse_args()
+
+    # Stage timings are recorded where answers are computed, so only thread pools report them
+    if args.metrics_file:
+        PrometheusExporter(METRICS, args.metrics_file, args.metrics_interval).start()
+    # Edits are picked up here; process pool workers follow the version sent with each request
+    if args.knowledge_interval > 0:
+        watch_knowledge(args.knowledge_interval)
+
+    service = AnswerService(workers=args.workers, pool=args.pool)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
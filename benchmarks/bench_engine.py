@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark the routing and knowledge hot paths of the answer engine
+Runs get_domain_response, is_stock_query, search_stock_knowledge and
+get_universal_knowledge over a synthetic query corpus and reports
+throughput and p50/p99 latency per function and query kind.
+
+    python benchmarks/bench_engine.py --output bench.json
+    python benchmarks/bench_engine.py --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import chat_engine  # noqa: E402
+
+DOMAINS = ['general', 'knowledge', 'finance', 'healthcare', 'technology', 'education']
+
+QUESTION_TEMPLATES = [
+    "What is {}?", "Explain {}", "How does {} work?", "Tell me about {}",
+    "define {}", "Can you help me understand {} please", "{} vs {}?",
+]
+
+FINANCE_TERMS = [
+    "RSI", "MACD", "Bollinger Bands", "P/E ratio", "EPS", "dividend yield", "bull market",
+    "bear market", "support level", "resistance", "stop loss", "diversification",
+    "position sizing", "interest rates", "inflation", "GDP", "portfolio beta", "Sharpe ratio",
+    "value investing", "momentum trading", "market cycle", "fear and greed index",
+]
+
+GENERAL_TOPICS = [
+    "python", "javascript", "react", "html", "css", "databases", "artificial intelligence",
+    "physics", "chemistry", "biology", "marketing", "management", "nutrition", "exercise",
+    "study habits", "art history", "music theory", "calculus", "psychology", "budgeting",
+]
+
+OFF_TOPIC_WORDS = [
+    "weather", "holiday", "recipe", "garden", "football", "movie", "travel", "cat", "guitar",
+    "birthday", "coffee", "mountain", "novel", "puzzle", "train", "ocean", "painting", "jazz",
+    "camping", "chess", "yesterday", "tomorrow", "friend", "window", "bicycle", "sunset",
+]
+
+FILLER = (
+    "so I was reading about this yesterday and honestly I am not sure I understood all of it "
+    "because there were a lot of details and some people online said different things"
+).split()
+
+
+def build_corpus(size, seed=0):
+    """{kind: [queries]} with size queries of each kind, reproducible from seed"""
+    rng = random.Random(seed)
+
+    def question(terms):
+        template = rng.choice(QUESTION_TEMPLATES)
+        return template.format(*(rng.choice(terms) for _ in range(template.count('{}'))))
+
+    def paragraph(terms, words):
+        parts = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(max(1, words // 40)):
+            parts.insert(rng.randrange(len(parts)), rng.choice(terms))
+        return ' '.join(parts) + '. ' + question(terms)
+
+    return {
+        'short': [question(GENERAL_TOPICS + FINANCE_TERMS) for _ in range(size)],
+        'long': [paragraph(GENERAL_TOPICS + FINANCE_TERMS, rng.randint(150, 400)) for _ in range(size)],
+        'finance': [rng.choice([question(FINANCE_TERMS), paragraph(FINANCE_TERMS, rng.randint(20, 60))])
+                    for _ in range(size)],
+        'off_topic': [' '.join(rng.choice(OFF_TOPIC_WORDS) for _ in range(rng.randint(3, 25)))
+                      for _ in range(size)],
+    }
+
+
+TARGETS = {
+    'get_domain_response': lambda i, query: chat_engine.get_domain_response(DOMAINS[i % len(DOMAINS)], query),
+    'is_stock_query': lambda i, query: chat_engine.is_stock_query(query),
+    'search_stock_knowledge': lambda i, query: chat_engine.search_stock_knowledge(query),
+    'get_universal_knowledge': lambda i, query: chat_engine.get_universal_knowledge(query),
+}
+
+
+def percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(target, queries, repeat):
+    """Per-call latencies (ns) over repeat passes, after one warm-up pass"""
+    for i, query in enumerate(queries):
+        target(i, query)
+    latencies = []
+    clock = time.perf_counter_ns
+    for _ in range(repeat):
+        for i, query in enumerate(queries):
+            start = clock()
+            target(i, query)
+            latencies.append(clock() - start)
+    return latencies
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        'calls': len(ordered),
+        'throughput_per_s': len(ordered) / (total / 1e9) if total else float('inf'),
+        'mean_us': total / len(ordered) / 1e3,
+        'p50_us': percentile(ordered, 50) / 1e3,
+        'p99_us': percentile(ordered, 99) / 1e3,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(functions, size, repeat, seed):
+    corpus = build_corpus(size, seed)
+    results = {}
+    for name in functions:
+        results[name] = {}
+        for kind, queries in corpus.items():
+            results[name][kind] = summarize(measure(TARGETS[name], queries, repeat))
+        results[name]['all'] = summarize(
+            measure(TARGETS[name], [q for queries in corpus.values() for q in queries], repeat))
+    return {
+        'benchmark': 'engine',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'queries_per_kind': size, 'repeat': repeat, 'seed': seed},
+        'results': results,
+    }
+
+
+def print_report(report, baseline=None):
+    print(f"{'function':<25} {'kind':<10} {'ops/s':>12} {'p50 µs':>10} {'p99 µs':>10}" +
+          (f" {'Δ p50':>8}" if baseline else ''))
+    for name, kinds in report['results'].items():
+        for kind, stats in kinds.items():
+            line = (f"{name:<25} {kind:<10} {stats['throughput_per_s']:>12,.0f} "
+                    f"{stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f}")
+            before = (baseline or {}).get('results', {}).get(name, {}).get(kind)
+            if before:
+                line += f" {(stats['p50_us'] / before['p50_us'] - 1) * 100:>+7.1f}%"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the answer engine hot paths')
+    parser.add_argument('--functions', nargs='+', choices=sorted(TARGETS), default=list(TARGETS))
+    parser.add_argument('--queries', type=int, default=500, help='queries per kind')
+    parser.add_argument('--repeat', type=int, default=3, help='timed passes over the corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    report = run(args.functions, args.queries, args.repeat, args.seed)
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized technical indicators on a market-sized price matrix
+Generates random-walk daily closes for --tickers tickers over --years years
+(252 bars a year) and times SMA, EMA, RSI, MACD and Bollinger Bands over the
+whole matrix at once. A bar-by-bar loop over a sample of tickers gives the
+reference values the results are checked against and the speedup. The
+same sample is replayed through the streaming classes one update per bar,
+timing each update and checking it reproduces the batch values exactly.
+
+    python benchmarks/bench_indicators.py --tickers 5000 --years 10
+    python benchmarks/bench_indicators.py --output indicators.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from bench_engine import git_revision
+import indicators  # noqa: E402  (importable once bench_engine set sys.path)
+
+BARS_PER_YEAR = 252
+
+
+# Bar-by-bar reference implementations, one ticker at a time
+def loop_sma(close, window=20):
+    out = [math.nan] * len(close)
+    total = 0.0
+    for t, price in enumerate(close):
+        total += price
+        if t >= window:
+            total -= close[t - window]
+        if t >= window - 1:
+            out[t] = total / window
+    return out
+
+
+def loop_ema(close, span=20, alpha=None):
+    alpha = alpha or 2.0 / (span + 1)
+    out = [math.nan] * len(close)
+    if len(close) < span:
+        return out
+    value = sum(close[:span]) / span
+    out[span - 1] = value
+    for t in range(span, len(close)):
+        value += alpha * (close[t] - value)
+        out[t] = value
+    return out
+
+
+def loop_rsi(close, period=14):
+    gains = [max(b - a, 0.0) for a, b in zip(close, close[1:])]
+    losses = [max(a - b, 0.0) for a, b in zip(close, close[1:])]
+    gain = loop_ema(gains, period, 1.0 / period)
+    loss = loop_ema(losses, period, 1.0 / period)
+    return [math.nan] + [math.nan if math.isnan(g) else 100.0 * g / (g + l) if g + l > 0 else 50.0
+                         for g, l in zip(gain, loss)]
+
+
+def loop_macd(close, fast=12, slow=26, signal=9):
+    line = [a - b for a, b in zip(loop_ema(close, fast), loop_ema(close, slow))]
+    signal_line = [math.nan] * (slow - 1) + loop_ema(line[slow - 1:], signal)
+    return line, signal_line
+
+
+def loop_bollinger(close, window=20, num_std=2.0):
+    out = [math.nan] * len(close)
+    for t in range(window - 1, len(close)):
+        values = close[t - window + 1:t + 1]
+        mean = sum(values) / window
+        out[t] = mean + num_std * math.sqrt(sum((v - mean) ** 2 for v in values) / window)
+    return out
+
+
+# name: (vectorized, bar-by-bar loop, new stream, the stream output compared with the vectorized one)
+INDICATORS = {
+    'sma': (lambda x: indicators.sma(x, 20), loop_sma, lambda: indicators.StreamingSMA(20), float),
+    'ema': (lambda x: indicators.ema(x, 20), loop_ema, lambda: indicators.StreamingEMA(20), float),
+    'rsi': (lambda x: indicators.rsi(x, 14), loop_rsi, lambda: indicators.StreamingRSI(14), float),
+    'macd': (lambda x: indicators.macd(x)[:2], loop_macd, indicators.StreamingMACD, lambda v: v[:2]),
+    'bollinger': (lambda x: indicators.bollinger_bands(x).upper, loop_bollinger, indicators.StreamingBollinger,
+                  lambda v: v.upper),
+}
+
+
+def random_walk(tickers, bars, seed):
+    """(tickers, bars) matrix of geometric random-walk closes"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.02, size=(tickers, bars))
+    return 100.0 * np.exp(np.cumsum(returns, axis=1))
+
+
+def max_difference(vectorized, reference):
+    """Largest absolute difference, treating matching NaNs as equal (inf when NaNs differ)"""
+    vectorized = np.asarray(vectorized, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    if not np.array_equal(np.isnan(vectorized), np.isnan(reference)):
+        return math.inf
+    both = ~np.isnan(reference)
+    return float(np.max(np.abs(vectorized[both] - reference[both]), initial=0.0))
+
+
+def replay(new_stream, pick, close):
+    """Stream every row bar by bar; (values shaped like the vectorized result, seconds per update)"""
+    rows = []
+    start = time.perf_counter()
+    for row in close.tolist():
+        stream = new_stream()
+        rows.append([pick(stream.update(price)) for price in row])
+    per_update = (time.perf_counter() - start) / close.size
+    values = np.array(rows)
+    return (tuple(np.moveaxis(values, -1, 0)) if values.ndim == 3 else values), per_update
+
+
+def same(vectorized, streamed):
+    """Whether both hold exactly the same values, NaNs included"""
+    if isinstance(vectorized, tuple):
+        return all(np.array_equal(v, s, equal_nan=True) for v, s in zip(vectorized, streamed))
+    return np.array_equal(vectorized, streamed, equal_nan=True)
+
+
+def run(tickers, years, repeat, sample, seed):
+    close = random_walk(tickers, years * BARS_PER_YEAR, seed)
+    sample = min(sample, tickers)
+    results = []
+    for name, (vectorized, loop, new_stream, pick) in INDICATORS.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            values = vectorized(close)
+            timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        reference = [loop(row.tolist()) for row in close[:sample]]
+        loop_s = (time.perf_counter() - start) / sample * tickers
+        if isinstance(values, tuple):
+            difference = max(max_difference(v[:sample], [r[i] for r in reference]) for i, v in enumerate(values))
+        else:
+            difference = max_difference(values[:sample], reference)
+
+        streamed, per_update = replay(new_stream, pick, close[:sample])
+        sampled = tuple(v[:sample] for v in values) if isinstance(values, tuple) else values[:sample]
+
+        best = min(timings)
+        results.append({
+            'indicator': name,
+            'seconds': best,
+            'bars_per_s': close.size / best,
+            'loop_seconds_estimate': loop_s,
+            'speedup': loop_s / best,
+            'max_abs_difference': difference,
+            'stream_us_per_update': per_update * 1e6,
+            'stream_matches_exactly': same(sampled, streamed),
+        })
+    return close.shape, results
+
+
+def print_report(report):
+    tickers, bars = report['shape']
+    print(f"{tickers:,} tickers x {bars:,} bars ({tickers * bars / 1e6:.1f}M bars)")
+    print(f"{'indicator':<10} {'seconds':>8} {'Mbars/s':>9} {'loop s (est.)':>14} {'speedup':>8} {'max |Δ|':>9} "
+          f"{'stream µs':>10} {'exact':>6}")
+    for result in report['results']:
+        print(f"{result['indicator']:<10} {result['seconds']:>8.3f} {result['bars_per_s'] / 1e6:>9.1f} "
+              f"{result['loop_seconds_estimate']:>14.1f} {result['speedup']:>7.0f}x {result['max_abs_difference']:>9.1e} "
+              f"{result['stream_us_per_update']:>10.2f} {'yes' if result['stream_matches_exactly'] else 'NO':>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vectorized technical indicators')
+    parser.add_argument('--tickers', type=int, default=5000)
+    parser.add_argument('--years', type=int, default=10, help='years of daily bars per ticker')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per indicator (the best is reported)')
+    parser.add_argument('--sample', type=int, default=20, help='tickers run through the bar-by-bar reference loop')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    args = parser.parse_args()
+
+    shape, results = run(args.tickers, args.years, args.repeat, args.sample, args.seed)
+    report = {
+        'benchmark': 'indicators',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'config': {'tickers': args.tickers, 'years': args.years, 'repeat': args.repeat, 'sample': args.sample,
+                   'seed': args.seed},
+        'shape': list(shape),
+        'results': results,
+    }
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the parallel Monte Carlo VaR simulation
+Builds a risk model of factor-model returns for --assets assets, then
+simulates --paths correlated buy-and-hold paths over --horizon days with
+each --workers pool size. Reports throughput, the speedup over one worker
+(run in-process, i.e. a single core), and checks that every worker count
+gives exactly the same VaR and expected shortfall.
+
+    python benchmarks/bench_monte_carlo.py --paths 1000000 --workers 1 2 4
+    python benchmarks/bench_monte_carlo.py --output monte_carlo.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from bench_engine import git_revision
+from bench_risk import factor_prices
+import portfolio_risk  # noqa: E402  (importable once bench_engine set sys.path)
+import risk_simulation  # noqa: E402
+
+
+def run(assets, years, paths, horizon, portfolios, workers, confidence, seed):
+    prices = factor_prices(assets, years * portfolio_risk.TRADING_DAYS, seed)
+    model = portfolio_risk.RiskModel(portfolio_risk.returns(prices))
+    weights = np.random.default_rng(seed + 1).dirichlet(np.ones(assets), size=portfolios)
+    model.covariance_factor  # factored once, outside the timings
+
+    results = []
+    baseline = None
+    for count in workers:
+        start = time.perf_counter()
+        simulated = risk_simulation.simulate_var(model, weights, confidence, horizon, paths, seed, count)
+        seconds = time.perf_counter() - start
+        if baseline is None:
+            baseline = (seconds, simulated)
+        results.append({
+            'workers': count,
+            'seconds': seconds,
+            'paths_per_s': paths / seconds,
+            'speedup': baseline[0] / seconds,
+            'identical_to_first': bool(np.array_equal(simulated.var, baseline[1].var)
+                                       and np.array_equal(simulated.expected_shortfall,
+                                                          baseline[1].expected_shortfall)),
+            'var': simulated.var.tolist(),
+            'expected_shortfall': simulated.expected_shortfall.tolist(),
+        })
+    return {
+        'chunks': len(risk_simulation.chunk_sizes(paths, assets)),
+        'chunk_paths': risk_simulation.chunk_sizes(paths, assets)[0],
+        'parametric_var': model.parametric_var(weights, confidence, horizon).tolist(),
+        'levels': results,
+    }
+
+
+def print_report(report):
+    config = report['config']
+    results = report['results']
+    print(f"{config['paths']:,} paths x {config['horizon']} days, {config['assets']} assets, "
+          f"{config['portfolios']} portfolio(s), {results['chunks']} chunks of {results['chunk_paths']:,} paths, "
+          f"{report['cpus']} CPU(s)")
+    print(f"{'workers':>7} {'seconds':>8} {'Mpaths/s':>9} {'speedup':>8} {'identical':>10} {'VaR':>8} {'ES':>8}")
+    for level in results['levels']:
+        print(f"{level['workers']:>7} {level['seconds']:>8.2f} {level['paths_per_s'] / 1e6:>9.2f} "
+              f"{level['speedup']:>7.2f}x {'yes' if level['identical_to_first'] else 'NO':>10} "
+              f"{level['var'][0]:>8.2%} {level['expected_shortfall'][0]:>8.2%}")
+    print(f"Parametric VaR of the first portfolio for comparison: {results['parametric_var'][0]:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the parallel Monte Carlo VaR simulation')
+    parser.add_argument('--assets', type=int, default=100)
+    parser.add_argument('--years', type=int, default=5, help='years of daily returns the model is built from')
+    parser.add_argument('--paths', type=int, default=1_000_000)
+    parser.add_argument('--horizon', type=int, default=10, help='days each path is compounded over')
+    parser.add_argument('--portfolios', type=int, default=1, help='portfolios measured on the same paths')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='pool sizes; the first is the baseline')
+    parser.add_argument('--confidence', type=float, default=0.99)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    args = parser.parse_args()
+
+    report = {
+        'benchmark': 'monte_carlo',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'cpus': os.cpu_count(),
+        'config': {'assets': args.assets, 'years': args.years, 'paths': args.paths, 'horizon': args.horizon,
+                   'portfolios': args.portfolios, 'workers': args.workers, 'confidence': args.confidence,
+                   'seed': args.seed},
+        'results': run(args.assets, args.years, args.paths, args.horizon, args.portfolios, args.workers,
+                       args.confidence, args.seed),
+    }
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
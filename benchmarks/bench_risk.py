@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark the portfolio risk engine on thousands of assets
+Generates factor-model daily returns for each --assets size, builds the
+risk model (returns and covariance matrix) and measures a batch of
+--portfolios random portfolios in one call. A loop over a sample of
+portfolios, each computed from its own return series, gives the reference
+values and the speedup. Also times a what-if query answered from the
+cached model against one that rebuilds the covariance matrix.
+
+    python benchmarks/bench_risk.py --assets 1000 5000 --portfolios 1000
+    python benchmarks/bench_risk.py --output risk.json
+"""
+
+import argparse
+import json
+import platform
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+
+from bench_engine import git_revision
+import portfolio_risk  # noqa: E402  (importable once bench_engine set sys.path)
+
+FACTORS = 5
+
+
+def factor_prices(assets, observations, seed):
+    """(observations + 1, assets) prices driven by a few common factors plus noise"""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0.0, 0.008, size=(observations, FACTORS))
+    loadings = rng.normal(0.6, 0.4, size=(FACTORS, assets))
+    noise = rng.normal(0.0003, 0.015, size=(observations, assets))
+    prices = np.empty((observations + 1, assets))
+    prices[0] = 100.0
+    prices[1:] = 100.0 * np.cumprod(1.0 + factors @ loadings + noise, axis=0)
+    return prices
+
+
+def loop_report(returns, weights, confidence=0.95):
+    """Figures of one portfolio from its own return series, without a covariance matrix"""
+    pnl = returns @ weights
+    market = returns.mean(axis=1)
+    volatility = pnl.std(ddof=1)
+    return (volatility * np.sqrt(portfolio_risk.TRADING_DAYS),
+            NormalDist().inv_cdf(confidence) * volatility - pnl.mean(),
+            -np.quantile(pnl, 1.0 - confidence),
+            np.cov(pnl, market)[0, 1] / market.var(ddof=1))
+
+
+def run_level(assets, observations, portfolios, sample, seed):
+    rng = np.random.default_rng(seed + 1)
+    prices = factor_prices(assets, observations, seed)
+    weights = rng.dirichlet(np.ones(assets), size=portfolios)
+
+    start = time.perf_counter()
+    model = portfolio_risk.RiskModel(portfolio_risk.returns(prices))
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = model.report(weights)
+    contributions = model.risk_contributions(weights)
+    batch_s = time.perf_counter() - start
+
+    sample = min(sample, portfolios)
+    start = time.perf_counter()
+    reference = [loop_report(model.returns, w) for w in weights[:sample]]
+    loop_s = (time.perf_counter() - start) / sample * portfolios
+    batched = np.column_stack([report.volatility, report.parametric_var, report.historical_var, report.beta])[:sample]
+    difference = float(np.max(np.abs(batched - np.array(reference))))
+    contribution_gap = float(np.max(np.abs(contributions.component.sum(axis=1) - report.volatility)))
+
+    # What-if: another mix of the same prices, from the cached model and from scratch
+    portfolio_risk.cached_model(prices)
+    start = time.perf_counter()
+    portfolio_risk.cached_model(prices).report(weights[0])
+    cached_s = time.perf_counter() - start
+    start = time.perf_counter()
+    portfolio_risk.RiskModel(portfolio_risk.returns(prices)).report(weights[0])
+    rebuilt_s = time.perf_counter() - start
+
+    return {
+        'assets': assets,
+        'observations': model.observations,
+        'portfolios': portfolios,
+        'build_s': build_s,
+        'batch_s': batch_s,
+        'batch_us_per_portfolio': batch_s / portfolios * 1e6,
+        'loop_seconds_estimate': loop_s,
+        'speedup': loop_s / batch_s,
+        'max_abs_difference': difference,
+        'contribution_sum_error': contribution_gap,
+        'what_if_cached_ms': cached_s * 1e3,
+        'what_if_rebuilt_ms': rebuilt_s * 1e3,
+    }
+
+
+def print_report(report):
+    print(f"{'assets':>7} {'build s':>8} {'batch s':>8} {'µs/portf.':>10} {'loop s (est.)':>14} {'speedup':>8} "
+          f"{'max |Δ|':>9} {'what-if ms':>11} {'rebuilt ms':>11}")
+    for level in report['results']:
+        print(f"{level['assets']:>7,} {level['build_s']:>8.2f} {level['batch_s']:>8.2f} "
+              f"{level['batch_us_per_portfolio']:>10.1f} {level['loop_seconds_estimate']:>14.1f} "
+              f"{level['speedup']:>7.0f}x {level['max_abs_difference']:>9.1e} {level['what_if_cached_ms']:>11.1f} "
+              f"{level['what_if_rebuilt_ms']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the portfolio risk engine')
+    parser.add_argument('--assets', type=int, nargs='+', default=[1000, 5000], help='universe sizes to test')
+    parser.add_argument('--years', type=int, default=5, help='years of daily returns')
+    parser.add_argument('--portfolios', type=int, default=1000, help='portfolios measured in one batched call')
+    parser.add_argument('--sample', type=int, default=50, help='portfolios run through the one-at-a-time loop')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    args = parser.parse_args()
+
+    observations = args.years * portfolio_risk.TRADING_DAYS
+    report = {
+        'benchmark': 'risk',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'config': {'years': args.years, 'portfolios': args.portfolios, 'sample': args.sample, 'seed': args.seed},
+        'results': [run_level(assets, observations, args.portfolios, args.sample, args.seed) for assets in args.assets],
+    }
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
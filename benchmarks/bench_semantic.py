@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hashed n-gram similarity search at catalogue scale
+Indexes the real stock concepts plus synthetic filler concepts (up to
+--concepts documents), then queries misspelled concept titles one at a
+time and in batches. Reports build time, per-query latency, how often the
+intended concept ranks first and how often it also clears the similarity
+threshold the engine answers from.
+
+    python benchmarks/bench_semantic.py --concepts 1000 10000 50000
+    python benchmarks/bench_semantic.py --concepts 50000 --output semantic.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench_engine import ROOT, git_revision, percentile
+from knowledge_search import HashedNgramIndex  # noqa: E402  (importable once bench_engine set sys.path)
+
+SYLLABLES = [
+    'ta', 're', 'in', 'on', 'er', 'an', 'st', 'ing', 'tion', 'al', 'co', 'de', 'pro', 'ex', 'ma', 'li', 've',
+    'ri', 'con', 'ment', 'ly', 'ed', 'es', 'ic', 'ar', 'ter', 'ne', 'po', 'se', 'ca', 'lo', 'mi', 'ra', 'ble',
+]
+
+
+def load_content():
+    return json.loads((ROOT / 'knowledge' / 'content.json').read_text())
+
+
+def misspell(text, rng):
+    """Drop, double or swap one letter of a longer word"""
+    words = text.split()
+    i = max(range(len(words)), key=lambda j: len(words[j]))
+    word = words[i]
+    if len(word) > 3:
+        k = rng.randrange(1, len(word) - 1)
+        word = rng.choice([word[:k] + word[k + 1:], word[:k] + word[k] + word[k:],
+                           word[:k - 1] + word[k] + word[k - 1] + word[k + 1:]])
+    words[i] = word
+    return ' '.join(words).lower()
+
+
+def build_documents(content, size, rng):
+    """Real concepts first, then filler concepts built from made-up words and the real vocabulary"""
+    concepts = [c for data in content['stock_knowledge_base'].values() for c in data['concepts']]
+    documents = [(c['title'], f"{c['definition']} {' '.join(c['characteristics'])}") for c in concepts]
+    real_words = sorted({w for title, body in documents for w in f"{title} {body}".lower().split()})
+    made_up = sorted({''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(30000)})
+    words = real_words * 20 + made_up
+    while len(documents) < size:
+        documents.append((' '.join(rng.choice(words) for _ in range(rng.randint(2, 4))).title(),
+                          ' '.join(rng.choice(words) for _ in range(30))))
+    return concepts, documents
+
+
+def run_level(content, size, queries, batch, seed):
+    rng = random.Random(seed)
+    concepts, documents = build_documents(content, size, rng)
+    semantic = content['semantic']
+    start = time.perf_counter()
+    index = HashedNgramIndex(documents, stopwords=semantic['stopwords'], field_weights=semantic['field_weights'])
+    build_s = time.perf_counter() - start
+
+    targets = [rng.randrange(len(concepts)) for _ in range(queries)]
+    texts = [misspell(concepts[target]['title'], rng) for target in targets]
+    index.search_batch(texts[:10], 1)
+
+    latencies = []
+    hits = 0
+    confident = 0
+    for target, text in zip(targets, texts):
+        start = time.perf_counter()
+        results = index.search(text, 3)
+        latencies.append(time.perf_counter() - start)
+        if results and results[0][0] == target:
+            hits += 1
+            confident += results[0][1] > semantic['threshold']
+    latencies.sort()
+
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch):
+        index.search_batch(texts[offset:offset + batch], 3, semantic['threshold'])
+    batch_s = time.perf_counter() - start
+
+    return {
+        'concepts': len(documents),
+        'postings': len(index.to_arrays()[2]),
+        'build_s': build_s,
+        'p50_us': percentile(latencies, 50) * 1e6,
+        'p99_us': percentile(latencies, 99) * 1e6,
+        'batch_us_per_query': batch_s / len(texts) * 1e6,
+        'top1_rate': hits / len(texts),
+        'top1_above_threshold_rate': confident / len(texts),
+    }
+
+
+def print_report(report):
+    print(f"{'concepts':>9} {'postings':>10} {'build s':>8} {'p50 µs':>8} {'p99 µs':>8} {'batch µs':>9} "
+          f"{'top-1':>6} {'≥ threshold':>11}")
+    for level in report['results']:
+        print(f"{level['concepts']:>9,} {level['postings']:>10,} {level['build_s']:>8.1f} {level['p50_us']:>8.1f} "
+              f"{level['p99_us']:>8.1f} {level['batch_us_per_query']:>9.1f} {level['top1_rate']:>6.0%} "
+              f"{level['top1_above_threshold_rate']:>11.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hashed n-gram similarity search at catalogue scale')
+    parser.add_argument('--concepts', type=int, nargs='+', default=[1000, 10000, 50000], help='index sizes to test')
+    parser.add_argument('--queries', type=int, default=500, help='misspelled titles to look up per size')
+    parser.add_argument('--batch', type=int, default=64, help='queries per search_batch call')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    args = parser.parse_args()
+
+    content = load_content()
+    report = {
+        'benchmark': 'semantic',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'queries': args.queries, 'batch': args.batch, 'seed': args.seed},
+        'results': [run_level(content, size, args.queries, args.batch, args.seed) for size in args.concepts],
+    }
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Measure how much typo correction adds to routing
+Misspells the finance terms and topics of the benchmark questions and
+checks how often each one still gets the answer its correctly spelled
+version gets: routed as typed, with misspelled words corrected, and with
+the n-gram similarity fallback as well. Also reports how often ordinary
+off-topic text is "corrected" and what a correction costs.
+
+    python benchmarks/bench_typos.py --queries 2000
+    python benchmarks/bench_typos.py --output typos.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench_engine import (DOMAINS, FILLER, FINANCE_TERMS, GENERAL_TOPICS, OFF_TOPIC_WORDS, QUESTION_TEMPLATES,
+                          git_revision, percentile)
+from bench_semantic import misspell
+
+import chat_engine  # noqa: E402  (importable once bench_engine set sys.path)
+
+
+def build_corpus(size, seed):
+    """(domain, question, the same question with its topic misspelled) triples"""
+    rng = random.Random(seed)
+    terms = [term for term in FINANCE_TERMS + GENERAL_TOPICS if max(len(word) for word in term.split()) > 4]
+    corpus = []
+    while len(corpus) < size:
+        term = rng.choice(terms)
+        typo = misspell(term, rng)
+        if typo == term.lower():
+            continue
+        template = rng.choice([t for t in QUESTION_TEMPLATES if t.count('{}') == 1])
+        corpus.append((rng.choice(DOMAINS), template.format(term), template.format(typo)))
+    return corpus
+
+
+def exact_ref(knowledge, domain, message):
+    """Reference of the answer routing finds for message as typed, or None"""
+    hits = knowledge.matcher.scan(message.lower())
+    results = knowledge.search_batch([message], 3)[0] if not hits.isdisjoint(knowledge.stock_phrases) else None
+    if results:
+        return chat_engine.STOCK_CARD, (results[0]['concept']['title'],)
+    rule_id = chat_engine.match_intent(knowledge, hits, domain)
+    return (rule_id, ()) if rule_id else None
+
+
+def run(size, seed):
+    knowledge = chat_engine.KNOWLEDGE
+    corpus = build_corpus(size, seed)
+    found = Counter()
+    corrected_words = Counter()
+    latencies = []
+    for domain, question, typo in corpus:
+        expected = chat_engine.resolve_message(domain, question)
+        as_typed = exact_ref(knowledge, domain, typo)
+        started = time.perf_counter()
+        _, corrections = chat_engine.correct_query(typo)
+        latencies.append(time.perf_counter() - started)
+        corrected_words.update(corrections)
+        with_typos = as_typed or chat_engine.corrected_ref(knowledge, domain, typo)
+        found['as_typed'] += as_typed == expected
+        found['corrected'] += with_typos == expected
+        found['full'] += chat_engine.resolve_message(domain, typo) == expected
+    latencies.sort()
+
+    # Ordinary text that must be left alone
+    rng = random.Random(seed)
+    words = OFF_TOPIC_WORDS + FILLER
+    off_topic = [' '.join(rng.choice(words) for _ in range(rng.randint(3, 25))) for _ in range(size)]
+    changed = sum(bool(chat_engine.correct_query(text)[1]) for text in off_topic)
+    rerouted = sum(exact_ref(knowledge, 'general', text) is None
+                   and chat_engine.corrected_ref(knowledge, 'general', text) is not None for text in off_topic)
+
+    return {
+        'queries': len(corpus),
+        'as_typed_rate': found['as_typed'] / len(corpus),
+        'corrected_rate': found['corrected'] / len(corpus),
+        'full_pipeline_rate': found['full'] / len(corpus),
+        'correct_p50_us': percentile(latencies, 50) * 1e6,
+        'correct_p99_us': percentile(latencies, 99) * 1e6,
+        'off_topic_corrected_rate': changed / len(off_topic),
+        'off_topic_rerouted_rate': rerouted / len(off_topic),
+        'top_corrections': [[word, term, count] for (word, term), count in corrected_words.most_common(15)],
+    }
+
+
+def print_report(report):
+    result = report['results']
+    print(f"Misspelled questions answered as if spelled correctly ({result['queries']:,} queries)")
+    print(f"  {'routed as typed':<34} {result['as_typed_rate']:>6.1%}")
+    print(f"  {'+ typo correction':<34} {result['corrected_rate']:>6.1%}")
+    print(f"  {'+ n-gram similarity (full engine)':<34} {result['full_pipeline_rate']:>6.1%}")
+    print(f"correct_query p50 {result['correct_p50_us']:.1f} µs, p99 {result['correct_p99_us']:.1f} µs")
+    print(f"Off-topic text with a correction: {result['off_topic_corrected_rate']:.1%}, "
+          f"routed differently because of it: {result['off_topic_rerouted_rate']:.1%}")
+    print("Most frequent corrections:")
+    for word, term, count in result['top_corrections']:
+        print(f"  {word:>18} -> {term:<18} {count:>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the routing hit rate gained by typo correction')
+    parser.add_argument('--queries', type=int, default=2000, help='misspelled questions to route')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    args = parser.parse_args()
+
+    report = {
+        'benchmark': 'typos',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'knowledge': chat_engine.knowledge_version(),
+        'config': {'queries': args.queries, 'seed': args.seed},
+        'results': run(args.queries, args.seed),
+    }
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
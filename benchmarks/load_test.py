@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Load-test the Streamlit app with many simultaneous simulated sessions
+Drives streamlit_app.py through streamlit.testing.v1.AppTest (no browser, no
+network): each session switches domains, sends messages, searches the
+Knowledge tab and clicks Quick Access. Reports rerun latency percentiles,
+throughput and memory growth for each session count.
+
+All sessions are open at once and share the process-wide caches, as on a
+real server. AppTest is not thread-safe, so their reruns are interleaved
+round-robin on one thread rather than run in parallel.
+
+    python benchmarks/load_test.py --sessions 1 10 50 --steps 12
+    python benchmarks/load_test.py --sessions 100 --output load.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench_engine import DOMAINS, FINANCE_TERMS, GENERAL_TOPICS, QUESTION_TEMPLATES, ROOT, git_revision, percentile
+
+APP_PATH = ROOT / 'streamlit_app.py'
+QUICK_ACCESS = ['Technical Analysis', 'Fundamental Analysis', 'Risk Management']
+ACTIONS = ['switch_domain', 'send', 'send', 'search', 'quick_access']
+
+
+def rss_bytes():
+    """Current resident set size, or the peak where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class SimulatedSession:
+    """One user clicking through the app, recording the latency of every rerun"""
+
+    def __init__(self, seed, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.rng = random.Random(seed)
+        self.app = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        self.latencies = []
+        self.errors = 0
+
+    def _timed(self, action):
+        start = time.perf_counter()
+        action()
+        self.latencies.append(time.perf_counter() - start)
+        if self.app.exception:
+            self.errors += 1
+
+    def _button(self, text):
+        return next(button for button in self.app.button if text in button.label)
+
+    def question(self):
+        template = self.rng.choice(QUESTION_TEMPLATES)
+        return template.format(*(self.rng.choice(GENERAL_TOPICS + FINANCE_TERMS) for _ in range(template.count('{}'))))
+
+    def switch_domain(self):
+        self._timed(lambda: self.app.sidebar.selectbox[0].select(self.rng.choice(DOMAINS)).run())
+
+    def send(self):
+        self.app.text_input(key='chat_input').input(self.question())
+        self._timed(lambda: self._button('Send').click().run())
+
+    def search(self):
+        search_box = next(box for box in self.app.text_input if 'Search market' in box.label)
+        self._timed(lambda: search_box.input(self.rng.choice(FINANCE_TERMS)).run())
+
+    def quick_access(self):
+        self._timed(lambda: self._button(self.rng.choice(QUICK_ACCESS)).click().run())
+
+    def start(self):
+        self._timed(self.app.run)
+        return self
+
+    def step(self):
+        getattr(self, self.rng.choice(ACTIONS))()
+
+
+def run_level(sessions, steps, seed, timeout):
+    """Open sessions and step each of them in turn; they stay alive until memory is measured"""
+    gc.collect()
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    finished = [SimulatedSession(seed * 100003 + i, timeout).start() for i in range(sessions)]
+    for _ in range(steps):
+        for session in finished:
+            session.step()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    rss_growth = rss_bytes() - rss_before
+
+    latencies = sorted(latency for session in finished for latency in session.latencies)
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'errors': sum(session.errors for session in finished),
+        'elapsed_s': elapsed,
+        'throughput_per_s': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1e3,
+        'p90_ms': percentile(latencies, 90) * 1e3,
+        'p99_ms': percentile(latencies, 99) * 1e3,
+        'max_ms': latencies[-1] * 1e3,
+        'rss_growth_mb': rss_growth / 2**20,
+        'rss_per_session_kb': rss_growth / sessions / 1024,
+    }
+
+
+def print_report(report):
+    print(f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'reruns/s':>9} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'RSS +MB':>8} {'KB/session':>10}")
+    for level in report['results']:
+        print(f"{level['sessions']:>8} {level['reruns']:>7} {level['errors']:>6} {level['throughput_per_s']:>9.1f} "
+              f"{level['p50_ms']:>8.1f} {level['p90_ms']:>8.1f} {level['p99_ms']:>8.1f} {level['max_ms']:>8.1f} "
+              f"{level['rss_growth_mb']:>8.1f} {level['rss_per_session_kb']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the Streamlit app with simultaneous AppTest sessions')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 10, 50], help='numbers of simultaneous sessions to run')
+    parser.add_argument('--steps', type=int, default=10, help='interactions per session after the first run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120.0, help='seconds allowed for one rerun')
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    args = parser.parse_args()
+
+    # Keep history and metrics files out of the working tree, and AppTest's bare-mode warnings out of the report
+    workdir = tempfile.mkdtemp(prefix='zeno-load-')
+    os.environ.setdefault('ZENO_HISTORY_DB', os.path.join(workdir, 'chat_history.db'))
+    os.environ.setdefault('ZENO_METRICS_FILE', os.path.join(workdir, 'zeno_metrics.prom'))
+    logging.disable(logging.WARNING)
+
+    # A throwaway session tries every action once to build the process-wide caches,
+    # so the first level is not charged for them
+    warm_up = SimulatedSession(args.seed, args.timeout).start()
+    for action in ACTIONS:
+        getattr(warm_up, action)()
+
+    results = []
+    for sessions in args.sessions:
+        results.append(run_level(sessions, args.steps, args.seed, args.timeout))
+    report = {
+        'benchmark': 'load',
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'steps': args.steps, 'seed': args.seed},
+        'results': results,
+    }
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
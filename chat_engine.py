@@ -0,0 +1,604 @@
+"""
+Zeno answer engine
+Routing, the stock market knowledge base and the universal knowledge
+answers, with no Streamlit dependency so batch jobs, tests and other
+services can import it. ChatEngine is the entry point. The content itself
+lives in knowledge/content.json and is read through a memory-mapped
+snapshot (see knowledge_store.py).
+"""
+
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import indicators
+import portfolio_risk
+import risk_simulation
+from knowledge_store import KnowledgeWatcher, load_knowledge
+from metrics import METRICS
+from response_cache import ResponseCache
+
+# Answer texts, routing rules and the stock knowledge base of the running process.
+# Functions read it once per call, so a reload never changes it under a running answer.
+KNOWLEDGE = load_knowledge()
+
+# Replaced versions kept reachable from the live one; older ones are released
+KNOWLEDGE_VERSIONS_KEPT = 2
+
+def set_knowledge(snapshot):
+    """Make snapshot the live knowledge version
+
+    Answers already being computed finish on the version they started with.
+    The last few replaced versions stay reachable from the new one so replies
+    rendered just before a reload still resolve; stored replies carry their
+    own text, and render_stored() covers answers removed longer ago.
+    """
+    global KNOWLEDGE
+    snapshot.previous = KNOWLEDGE
+    kept = snapshot
+    for _ in range(KNOWLEDGE_VERSIONS_KEPT):
+        if kept.previous is None:
+            break
+        kept = kept.previous
+    kept.previous = None
+    KNOWLEDGE = snapshot
+
+def knowledge_version():
+    return KNOWLEDGE.label
+
+def content_version():
+    """Version number of the live knowledge content, as set in content.json"""
+    return KNOWLEDGE.version
+
+def watch_knowledge(interval=2.0):
+    """Start a background thread that swaps in the knowledge content whenever it is edited"""
+    watcher = KnowledgeWatcher(KNOWLEDGE, set_knowledge, interval=interval)
+    watcher.start()
+    return watcher
+
+# Intent routing
+# Every trigger phrase used for routing is compiled into a single Aho-Corasick
+# automaton, so a message is scanned in one pass no matter how many rules exist.
+# Rules are then resolved in priority order from the phrase ids found.
+def match_intent(knowledge, hits, domain=None, start=0, stop=None):
+    """Return the highest-priority rule id in [start, stop) satisfied by the scanned phrases, or None"""
+    best = stop
+    for phrase in hits:
+        for priority in knowledge.rules_for_phrase(phrase):
+            if priority < start or (best is not None and priority >= best):
+                continue
+            _, rule_domain, groups, veto = knowledge.rule(priority)
+            if rule_domain is not None and rule_domain != domain:
+                continue
+            if hits.isdisjoint(veto) and all(not hits.isdisjoint(g) for g in groups):
+                best = priority
+    return None if best is None or best == stop else knowledge.rule(best)[0]
+
+# Sample responses for different domains
+def get_domain_response(domain, user_message):
+    return render_response(*resolve_message(domain, user_message))
+
+def resolve_message(domain, user_message):
+    """(response id, params) of the answer to one message"""
+    knowledge = KNOWLEDGE
+    started = time.perf_counter()
+    hits = knowledge.matcher.scan(user_message.lower())
+    is_stock = not hits.isdisjoint(knowledge.stock_phrases)
+    METRICS.since('classify', started)
+
+    # Use stock knowledge only when the query is finance-related
+    stock_search_results = None
+    if is_stock:
+        started = time.perf_counter()
+        stock_search_results = knowledge.search_batch([user_message], 3)[0]
+        METRICS.since('kb_search', started)
+    return resolve_response(domain, user_message, hits, stock_search_results, knowledge)
+
+# Response references
+# An answer is identified by a response id plus parameters: an intent_responses
+# key, a stock concept card or the fallback for a message. Session messages keep
+# the reference and the text is rendered on demand, so each canned answer is
+# held once per process however many conversations contain it. The history
+# store saves the text as well, since the content can change after a restart.
+STOCK_CARD = 'stock_card'
+FALLBACK = 'fallback'
+INDICATOR_REPORT = 'indicator_report'
+RISK_REPORT = 'risk_report'
+
+def resolve_response(domain, user_message, hits, stock_search_results, knowledge=None, semantic=True):
+    """(response id, params) for an already scanned message and its stock search results
+
+    With semantic=False the fuzzy n-gram match is skipped and unmatched
+    messages resolve to the fallback, for callers that batch that step.
+    """
+    if stock_search_results:
+        return STOCK_CARD, (stock_search_results[0]['concept']['title'],)
+    knowledge = knowledge or KNOWLEDGE
+
+    # Enhanced specific responses for common questions (intent-first, then domain)
+    # resolved from a single scan of the message
+    started = time.perf_counter()
+    rule_id = match_intent(knowledge, hits, domain, stop=knowledge.universal_start)
+    METRICS.since('domain_cascade', started)
+
+    # Then the universal knowledge topics
+    if rule_id is None:
+        started = time.perf_counter()
+        rule_id = match_intent(knowledge, hits, start=knowledge.universal_start)
+        METRICS.since('universal_lookup', started)
+    if rule_id:
+        return rule_id, ()
+
+    # Then the same routing with misspelled words corrected
+    ref = corrected_ref(knowledge, domain, user_message)
+    if ref:
+        return ref
+
+    # Then the closest concept or topic by n-gram similarity, for misspellings and paraphrases
+    if semantic:
+        ref = semantic_refs(knowledge, [_corrected_text(knowledge, user_message)])[0]
+        return ref or (FALLBACK, (domain, user_message))
+    return FALLBACK, (domain, user_message)
+
+def corrected_ref(knowledge, domain, user_message):
+    """Reference of the answer once the misspelled words of a message are corrected, or None"""
+    started = time.perf_counter()
+    corrected, corrections = knowledge.correct_spelling(user_message)
+    ref = None
+    if corrections:
+        hits = knowledge.matcher.scan(corrected)
+        results = knowledge.search_batch([corrected], 3)[0] if not hits.isdisjoint(knowledge.stock_phrases) else None
+        if results:
+            ref = STOCK_CARD, (results[0]['concept']['title'],)
+        else:
+            rule_id = match_intent(knowledge, hits, domain)
+            ref = (rule_id, ()) if rule_id else None
+    METRICS.since('typo_lookup', started)
+    return ref
+
+def _corrected_text(knowledge, message):
+    """The message with its misspelled words corrected, or as typed when it has none"""
+    corrected, corrections = knowledge.correct_spelling(message)
+    return corrected if corrections else message
+
+def semantic_refs(knowledge, messages):
+    """Reference of the closest concept or knowledge topic to each message, or None below the similarity threshold"""
+    started = time.perf_counter()
+    refs = []
+    for hits in knowledge.semantic_search_batch(messages, 1):
+        if not hits:
+            refs.append(None)
+            continue
+        doc_id = hits[0][0]
+        topic = knowledge.semantic_topic(doc_id)
+        refs.append((topic, ()) if topic else (STOCK_CARD, (knowledge.concept_titles[doc_id],)))
+    METRICS.since('semantic_lookup', started)
+    return refs
+
+def render_response(response_id, params=()):
+    """Answer text for a response reference"""
+    if response_id == STOCK_CARD:
+        return _in_any_version(lambda knowledge: _stock_card(knowledge, *params))
+    if response_id == INDICATOR_REPORT:
+        return indicator_report(*params)
+    if response_id == RISK_REPORT:
+        return risk_report(*params)
+    if response_id == FALLBACK:
+        return fallback_response(*params)
+    return _in_any_version(lambda knowledge: knowledge.response_text(response_id))
+
+# Shown for a stored reply whose answer no longer exists and whose text was not saved
+UNAVAILABLE_RESPONSE = "*This answer is no longer available.*"
+
+def render_stored(response, text=None):
+    """Text of a stored reply: the text saved with it, else its reference rendered now
+
+    A reference to an answer since removed from the content renders as a
+    short notice instead of raising KeyError.
+    """
+    if text:
+        return text
+    try:
+        return render_response(*response)
+    except KeyError:
+        return UNAVAILABLE_RESPONSE
+
+def _in_any_version(lookup):
+    """lookup(knowledge) on the live version, falling back to the versions it replaced"""
+    knowledge = KNOWLEDGE
+    while True:
+        try:
+            return lookup(knowledge)
+        except KeyError:
+            if knowledge.previous is None:
+                raise
+            knowledge = knowledge.previous
+
+def find_response_ref(text):
+    """Reference of a canned answer from its text, or None for message-specific answers"""
+    knowledge = KNOWLEDGE
+    return knowledge.derived('canned_refs', lambda: _canned_refs(knowledge)).get(text)
+
+def _canned_refs(knowledge):
+    refs = {text: (response_id, ()) for response_id, text in zip(knowledge.response_ids, knowledge.response_texts)}
+    refs.update({_stock_card(knowledge, title): (STOCK_CARD, (title,)) for title in knowledge.concept_titles})
+    return refs
+
+def _stock_card(knowledge, title):
+    cards = knowledge.derived('stock_cards', dict)
+    card = cards.get(title)
+    if card is None:
+        concept = knowledge.concept_by_title(title)
+        card = cards[title] = f"""📈 **{concept['title']}**
+
+**Definition:** {concept['definition']}
+
+**Key Characteristics:**
+{chr(10).join([f"• {char}" for char in concept['characteristics']])}
+
+**Example:** {concept['example']}
+
+**Strategy:** {concept['strategy']}
+
+*This is educational information only, not financial advice. Please consult with a financial advisor for personalized guidance.*"""
+    return card
+
+def fallback_response(domain, user_message):
+    """Answer for messages that no routing rule or knowledge topic matched"""
+    knowledge = KNOWLEDGE
+    # Use universal knowledge base as fallback for any unanswered questions
+    universal_response = _universal_default(knowledge, user_message)
+    if universal_response:
+        return universal_response
+
+    # Final fallback responses
+    # Pick the variant from a stable hash of the question rather than random.choice,
+    # so the same question always gets the same answer and stays cacheable
+    responses = knowledge.fallback_responses
+    domain_responses = responses.get(domain, responses['general'])
+    template = domain_responses[zlib.crc32(f"{domain}\0{user_message}".encode('utf-8')) % len(domain_responses)]
+    return template.replace('{message}', user_message)
+
+# Indicators of uploaded prices
+# "RSI for the uploaded data" is answered with numbers computed from the
+# prices the user uploaded. The reference carries the latest readings, so
+# stored replies render without the data.
+INDICATOR_PATTERN = re.compile(r"\b(rsi|macd|bollinger|sma|ema|moving averages?|indicators)\b(?:\s*\(?\s*(\d{1,3})\b)?")
+DATA_PATTERN = re.compile(r"\b(upload(?:ed)?|data(?:set)?|file|csv|my (?:prices|stocks?|tickers?)|calculate|compute)\b")
+INDICATOR_DEFAULTS = {'rsi': 14, 'sma': 20, 'ema': 20, 'bollinger': 20, 'macd': None}
+# Shortest period each indicator means anything over; shorter ones typed get the default
+INDICATOR_MIN_PERIODS = {'rsi': 2, 'sma': 1, 'ema': 1, 'bollinger': 2}
+REPORT_MAX_TICKERS = 20
+
+def indicator_request(message):
+    """[(indicator, period)] a message asks to compute on uploaded data, or None when it asks about something else"""
+    text = message.lower()
+    if not DATA_PATTERN.search(text):
+        return None
+    requested = []
+    for name, period in INDICATOR_PATTERN.findall(text):
+        if name == 'indicators':
+            names = list(INDICATOR_DEFAULTS)
+        elif name.startswith('moving average'):
+            names = ['sma', 'ema']
+        else:
+            names = [name]
+        for name in names:
+            default = INDICATOR_DEFAULTS[name]
+            valid = period and default and int(period) >= INDICATOR_MIN_PERIODS[name]
+            requested.append((name, int(period) if valid else default))
+    return list(dict.fromkeys(requested)) or None
+
+def indicator_ref(message, closes, label='uploaded data'):
+    """Reference of a report of the indicators a message asks for, computed on closes (dates x tickers), or None"""
+    requested = indicator_request(message)
+    if not requested or closes is None or closes.empty:
+        return None
+    columns = []
+    readings = []
+    for name, period in requested:
+        if name == 'rsi':
+            columns.append(f'RSI({period})')
+            readings.append(indicators.rsi(closes, period))
+        elif name in ('sma', 'ema'):
+            columns.append(f'{name.upper()}({period})')
+            readings.append(getattr(indicators, name)(closes, period))
+        elif name == 'macd':
+            columns += ['MACD(12,26,9)', 'Signal', 'Histogram']
+            readings += indicators.macd(closes)
+        else:
+            columns += [f'Upper band({period})', 'Middle band', 'Lower band']
+            readings += indicators.bollinger_bands(closes, period)
+    # Close and readings of each ticker on the last bar, rounded and with NaN as None so the reference stays JSON
+    latest = [indicators.latest(values) for values in (closes, *readings)]
+    rows = tuple((str(ticker), *(None if math.isnan(values[i]) else round(float(values[i]), 4) for values in latest))
+                 for i, ticker in enumerate(closes.columns[:REPORT_MAX_TICKERS]))
+    return INDICATOR_REPORT, (label, len(closes.columns), len(closes), str(closes.index[-1])[:10], tuple(columns), rows)
+
+def indicator_report(label, n_tickers, n_bars, last_bar, columns, rows):
+    """Markdown table of the latest indicator readings of uploaded prices"""
+    def cell(column, value):
+        if value is None:
+            return 'n/a'
+        if column.startswith('RSI'):
+            state = 'overbought' if value > 70 else 'oversold' if value < 30 else 'neutral'
+            return f"{value:.1f} ({state})"
+        return f"{value:,.2f}"
+
+    header = ['Ticker', 'Close', *columns]
+    lines = ['| ' + ' | '.join(header) + ' |', '|' + '---|' * len(header)]
+    for ticker, close, *values in rows:
+        lines.append('| ' + ' | '.join([ticker, cell('Close', close), *(cell(c, v) for c, v in zip(columns, values))]) + ' |')
+    more = f"\n\n*Showing {len(rows)} of {n_tickers} tickers.*" if n_tickers > len(rows) else ''
+    if any(value is None for row in rows for value in row[1:]):
+        more += "\n\n*n/a: no value on the last bar, either too little history or a gap in that ticker's prices since.*"
+    return f"""📊 **Indicators for {label}**
+
+Values on {last_bar}, the last of {n_bars} bars ({n_tickers} ticker{'s' if n_tickers != 1 else ''}).
+
+{chr(10).join(lines)}{more}
+
+*RSI above 70 is commonly read as overbought and below 30 as oversold; a positive MACD histogram means momentum is turning up. This is educational information only, not financial advice.*"""
+
+# Risk of an uploaded portfolio
+# "VaR of my uploaded portfolio" and "what if AAPL 60% MSFT 40%" are answered
+# from the uploaded prices, equally weighted unless the message gives
+# weights. The covariance matrix of an upload is built once and shared by
+# every what-if (portfolio_risk.cached_model). Asking for a Monte Carlo
+# simulation adds simulated VaR and expected shortfall, run in-process with a
+# fixed seed so the same question always gets the same figures. Its paths are
+# cut on wide uploads to keep the reply interactive, and recent results are
+# kept, since price answers skip the response cache.
+RISK_PATTERN = re.compile(r"\b(var|value at risk|sharpe|beta|volatility|risk|what if|monte carlo|simulat\w*|expected shortfall)\b")
+SIMULATION_PATTERN = re.compile(r"\b(monte carlo|simulat\w*|expected shortfall)\b")
+SIMULATION_PATHS = 100_000
+# Multiply-adds one chat simulation may spend (about half a second on one core), and the fewest paths it runs
+SIMULATION_WORK = 4_000_000_000
+SIMULATION_MIN_PATHS = 2_000
+SIMULATION_CACHE_SIZE = 32
+WEIGHT_TOKEN_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*%|([\w.\-]+)")
+RISK_CONFIDENCE = 0.95
+
+def portfolio_weights(message, tickers):
+    """{ticker: percent} for the tickers of the data a message gives weights to ("AAPL 60%", "40% in MSFT")
+
+    A percentage goes to the ticker named just before it when the first one
+    is written that way, else to the one just after; the other side is the
+    fallback.
+    """
+    by_name = {str(ticker).lower(): str(ticker) for ticker in tickers}
+    tokens = [(float(percent) if percent else None, word.strip('.-'))
+              for percent, word in WEIGHT_TOKEN_PATTERN.findall(message.lower())]
+
+    def ticker_at(i):
+        return by_name.get(tokens[i][1]) if 0 <= i < len(tokens) else None
+
+    def ticker_after(i):
+        i += 1
+        while i < len(tokens) and tokens[i][1] in ('in', 'of', 'into'):
+            i += 1
+        return ticker_at(i)
+
+    percents = [i for i, (percent, _) in enumerate(tokens) if percent is not None]
+    name_first = bool(percents) and ticker_at(percents[0] - 1) is not None
+    weights = {}
+    for i in percents:
+        sides = (ticker_at(i - 1), ticker_after(i))
+        for ticker in sides if name_first else reversed(sides):
+            if ticker and ticker not in weights:
+                weights[ticker] = tokens[i][0]
+                break
+    return weights
+
+# Monte Carlo figures of recent risk questions, by model and weights
+_simulations = OrderedDict()
+_simulations_lock = threading.Lock()
+
+def simulated_risk(model, weights):
+    """(VaR, expected shortfall, paths) of a portfolio by Monte Carlo, with paths bounded by SIMULATION_WORK"""
+    key = (model, tuple(weights))
+    with _simulations_lock:
+        simulated = _simulations.get(key)
+        if simulated is not None:
+            _simulations.move_to_end(key)
+            return simulated
+    # Each path draws a factor row per asset: assets x factor columns multiply-adds
+    paths = min(SIMULATION_PATHS, max(SIMULATION_MIN_PATHS, SIMULATION_WORK // model.covariance_factor.size))
+    var, shortfall, paths = risk_simulation.simulate_var(model, weights, RISK_CONFIDENCE, paths=paths)
+    simulated = (round(float(var), 6), round(float(shortfall), 6), paths)
+    with _simulations_lock:
+        _simulations[key] = simulated
+        while len(_simulations) > SIMULATION_CACHE_SIZE:
+            _simulations.popitem(last=False)
+    return simulated
+
+def risk_ref(message, closes, label='uploaded data'):
+    """Reference of a risk report of the portfolio a message describes, computed on closes (dates x tickers), or None"""
+    text = message.lower()
+    if closes is None or closes.empty or not RISK_PATTERN.search(text):
+        return None
+    named = portfolio_weights(text, closes.columns)
+    if not named and not DATA_PATTERN.search(text):
+        return None
+    try:
+        model = portfolio_risk.cached_model(closes)
+    except ValueError:
+        return None
+    if named and sum(named.values()) > 0:
+        weights = [named.get(ticker, 0.0) for ticker in model.assets]
+        total = sum(weights)
+        weights = [w / total for w in weights]
+    else:
+        weights = [1.0 / len(model.assets)] * len(model.assets)
+    report = model.report(weights, RISK_CONFIDENCE)
+    share = model.risk_contributions(weights).component / report.volatility
+    # Figures and the largest holdings, rounded and with NaN as None so the reference stays JSON
+    figures = tuple(None if math.isnan(value) else round(float(value), 6) for value in report)
+    simulated = simulated_risk(model, weights) if SIMULATION_PATTERN.search(text) else None
+    holdings = sorted(zip(model.assets, weights, share), key=lambda row: -row[1])[:REPORT_MAX_TICKERS]
+    rows = tuple((ticker, round(weight, 6), None if math.isnan(s) else round(float(s), 6))
+                 for ticker, weight, s in holdings if weight)
+    return RISK_REPORT, (label, len(model.assets), model.observations, str(closes.index[-1])[:10], bool(named),
+                         figures, rows, simulated)
+
+def risk_report(label, n_assets, n_returns, last_bar, custom_weights, figures, rows, simulated=None):
+    """Markdown summary of the risk figures of a portfolio of uploaded prices"""
+    def percent(value):
+        return 'n/a' if value is None else f"{value:.2%}"
+
+    def number(value):
+        return 'n/a' if value is None else f"{value:.2f}"
+
+    expected, volatility, sharpe, parametric, historical, beta = figures
+    confidence = f"{RISK_CONFIDENCE:.0%}"
+    measures = [
+        ('Expected return (annualized)', percent(expected)),
+        ('Volatility (annualized)', percent(volatility)),
+        ('Sharpe ratio', number(sharpe)),
+        (f'1-day VaR {confidence}, parametric', percent(parametric)),
+        (f'1-day VaR {confidence}, historical', percent(historical)),
+        ('Beta to the equal-weighted basket', number(beta)),
+    ]
+    if simulated:
+        var, shortfall, paths = simulated
+        measures += [(f'1-day VaR {confidence}, Monte Carlo ({paths:,} paths)', percent(var)),
+                     (f'1-day expected shortfall {confidence}, Monte Carlo', percent(shortfall))]
+    lines = ['| Measure | Value |', '|---|---|'] + [f'| {name} | {value} |' for name, value in measures]
+    holdings = ['| Ticker | Weight | Share of risk |', '|---|---|---|']
+    holdings += [f'| {ticker} | {weight:.1%} | {percent(share)} |' for ticker, weight, share in rows]
+    weighting = 'the weights you gave (scaled to 100%)' if custom_weights else f'equal weights across {n_assets} assets'
+    more = f"\n\n*Showing the {len(rows)} largest of {n_assets} holdings.*" if n_assets > len(rows) else ''
+    # Named weights are scaled to 100%, so the example names two tickers, the largest holding given less
+    compare = (f' Ask e.g. "what if {rows[0][0]} 40% {rows[1][0]} 60%" to compare another mix.' if len(rows) > 1
+               else '')
+    return f"""📉 **Portfolio risk for {label}**
+
+From {n_returns} daily returns up to {last_bar}, with {weighting}.
+
+{chr(10).join(lines)}
+
+{chr(10).join(holdings)}{more}
+
+*A {confidence} VaR of 2% means one day in twenty is expected to lose more than 2% of the portfolio's value.{compare} This is educational information only, not financial advice.*"""
+
+# Stock Market Knowledge Base
+def get_stock_knowledge_base():
+    return KNOWLEDGE.knowledge_base()
+
+def search_stock_knowledge(query):
+    """Search through stock market knowledge base"""
+    knowledge = KNOWLEDGE
+    results = knowledge.search_batch([query], 3)[0]
+    if results:
+        return results
+    # Then with misspelled words corrected, then by n-gram similarity
+    corrected, corrections = knowledge.correct_spelling(query)
+    return (corrections and knowledge.search_batch([corrected], 3)[0]) or knowledge.fuzzy_search_batch([query], 3)[0]
+
+# Heuristic to decide if a user query is about stocks/markets
+def is_stock_query(text: str) -> bool:
+    knowledge = KNOWLEDGE
+    if not knowledge.matcher.scan(text.lower()).isdisjoint(knowledge.stock_phrases):
+        return True
+    corrected, corrections = knowledge.correct_spelling(text)
+    return bool(corrections) and not knowledge.matcher.scan(corrected).isdisjoint(knowledge.stock_phrases)
+
+def correct_query(text):
+    """(lowercased text with misspelled words replaced by vocabulary terms, [(word, term)] corrections made)
+
+    Routing applies the same correction when nothing matches a message as typed.
+    """
+    return KNOWLEDGE.correct_spelling(text)
+
+def get_daily_tip():
+    """Get a random daily market tip"""
+    tips = KNOWLEDGE.daily_tips
+    return tips[random.randrange(len(tips))]
+
+def get_universal_knowledge(query):
+    """Comprehensive knowledge base for all topics"""
+    knowledge = KNOWLEDGE
+    rule_id = match_intent(knowledge, knowledge.matcher.scan(query.lower()), start=knowledge.universal_start)
+    text = query
+    if rule_id is None:
+        text = _corrected_text(knowledge, query)
+        if text is not query:
+            rule_id = match_intent(knowledge, knowledge.matcher.scan(text), start=knowledge.universal_start)
+    if rule_id:
+        return knowledge.response_text(rule_id)
+    ref = semantic_refs(knowledge, [text])[0]
+    if ref:
+        return render_response(*ref)
+    return _universal_default(knowledge, query)
+
+def _universal_default(knowledge, query):
+    """Default comprehensive response when no knowledge topic matches"""
+    return knowledge.universal_default.replace('{query}', query)
+
+class ChatEngine:
+    """Answers chat messages, memoizing them in a shared response cache"""
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else ResponseCache()
+
+    def answer(self, domain, message):
+        """Answer one message, through the response cache"""
+        return render_response(*self.answer_ref(domain, message))
+
+    def answer_ref(self, domain, message):
+        """(response id, params) of the answer to one message, through the response cache
+
+        Entries are keyed by knowledge version, so answers cached before a
+        reload are not served after it and age out of the LRU.
+        """
+        return self.cache.get_or_compute((knowledge_version(), domain, message), lambda: resolve_message(domain, message))
+
+    def answer_ref_with_prices(self, domain, message, closes, label='uploaded data'):
+        """answer_ref, except that requests for indicators or portfolio risk of uploaded prices are computed from closes
+
+        Those answers depend on the data, so they bypass the response cache.
+        """
+        return (indicator_ref(message, closes, label) or risk_ref(message, closes, label)
+                or self.answer_ref(domain, message))
+
+    def stream(self, domain, message):
+        """Yield the answer one markdown section (blank-line separated block) at a time"""
+        return self.stream_response(self.answer_ref(domain, message))
+
+    def stream_response(self, response):
+        """Yield the text of a response reference one markdown section at a time
+
+        Canned answers are split into sections; a model backend can plug in
+        here by yielding its tokens as they arrive.
+        """
+        sections = render_response(*response).split('\n\n')
+        for i, section in enumerate(sections):
+            yield section if i == len(sections) - 1 else section + '\n\n'
+
+    def answer_batch(self, requests):
+        """Answer many (domain, message) pairs, e.g. for offline evaluation and replay
+
+        Repeated questions are answered once, every finance query in the batch
+        is ranked in one vectorized knowledge search and every unmatched one in
+        one n-gram similarity pass. The shared cache is bypassed so a large
+        replay cannot evict live traffic.
+        """
+        keys = [(domain, message) for domain, message in requests]
+        messages = list(dict.fromkeys(message for _, message in keys))
+        knowledge = KNOWLEDGE
+        hits = {message: knowledge.matcher.scan(message.lower()) for message in messages}
+
+        stock_messages = [message for message in messages if not hits[message].isdisjoint(knowledge.stock_phrases)]
+        stock_results = dict(zip(stock_messages, knowledge.search_batch(stock_messages, 3)))
+
+        refs = {key: resolve_response(key[0], key[1], hits[key[1]], stock_results.get(key[1]), knowledge, semantic=False)
+                for key in dict.fromkeys(keys)}
+        unmatched = list(dict.fromkeys(key[1] for key, ref in refs.items() if ref[0] == FALLBACK))
+        corrected = [_corrected_text(knowledge, message) for message in unmatched]
+        matches = dict(zip(unmatched, semantic_refs(knowledge, corrected)))
+        return [render_response(*(matches.get(key[1]) or refs[key]) if refs[key][0] == FALLBACK else refs[key])
+                for key in keys]
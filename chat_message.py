@@ -0,0 +1,51 @@
+"""
+Chat message records
+A compact slotted record per message: an interned role, the user's text or
+a (response id, params) reference for bot replies, and an epoch-millisecond
+timestamp that is formatted only when the message is rendered.
+"""
+
+from datetime import datetime
+from enum import Enum
+
+from chat_engine import render_stored
+from history_store import now_ms
+
+
+class Role(Enum):
+    USER = 'user'
+    BOT = 'bot'
+
+
+class Message:
+    """One chat message; bot replies hold a response reference instead of canned text"""
+
+    __slots__ = ('id', 'role', 'content', 'response', 'created_at')
+
+    def __init__(self, id, role, content=None, response=None, created_at=None):
+        self.id = id
+        self.role = Role(role)
+        self.content = content
+        self.response = response
+        self.created_at = now_ms() if created_at is None else created_at
+
+    @property
+    def text(self):
+        return render_stored(self.response, self.content) if self.response else self.content
+
+    def time_label(self, fmt="%H:%M:%S"):
+        return datetime.fromtimestamp(self.created_at / 1000).strftime(fmt)
+
+    def to_record(self):
+        """JSON-serializable list form, used when a message is spilled to disk"""
+        return [self.id, self.role.value, self.content, self.response, self.created_at]
+
+    @classmethod
+    def from_record(cls, record):
+        id, role, content, response, created_at = record
+        if response is not None:
+            response = (response[0], tuple(response[1]))
+        return cls(id, role, content, response, created_at)
+
+    def __repr__(self):
+        return f"Message(id={self.id}, role={self.role.value}, created_at={self.created_at}, text={self.text[:40]!r})"
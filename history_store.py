@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Durable chat history
+Append-only message rows in SQLite (WAL mode), indexed by user and time.
+Writes are queued and committed in batches by a background thread so the
+UI never waits on the disk. Bot replies keep their text and, for canned
+answers, the response id plus params they came from, so a reply reads back
+as it was sent even after the knowledge content changes. Each distinct reply
+text is stored once, in a table keyed by its hash. Imports and exports the
+per-user layout of chatHistory.json used by the Node server:
+
+    {"<user id>": [{"user": "...", "assistant": "...", "timestamp": "<ISO 8601>"}, ...]}
+
+    python history_store.py import chatHistory.json
+    python history_store.py export chatHistory.json
+"""
+
+import argparse
+import atexit
+import hashlib
+import itertools
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from chat_engine import find_response_ref, render_stored
+
+DEFAULT_PATH = 'chat_history.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('user', 'bot')),
+    content TEXT NOT NULL,
+    domain TEXT,
+    created_at INTEGER NOT NULL,
+    response_id TEXT,
+    params TEXT,
+    text_hash BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_messages_user_time ON messages (user_id, created_at, id);
+CREATE TABLE IF NOT EXISTS texts (
+    hash BLOB PRIMARY KEY,
+    text TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Columns added since the first release of the schema, with their types
+ADDED_COLUMNS = {'response_id': 'TEXT', 'params': 'TEXT', 'text_hash': 'BLOB'}
+
+# A queued removal of a user's messages, applied in order with the queued inserts
+_Delete = namedtuple('_Delete', 'user_id')
+
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def now_ms():
+    return time.time_ns() // 1_000_000
+
+
+def _iso_to_ms(value):
+    return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() * 1000)
+
+
+def _ms_to_iso(value):
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class ChatHistoryStore:
+    """SQLite chat history with batched background writes"""
+
+    def __init__(self, path=DEFAULT_PATH, batch_size=256):
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Databases created before response references and shared texts were stored
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(messages)')}
+            for column, kind in ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE messages ADD COLUMN {column} {kind}')
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='history-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # In WAL mode NORMAL only syncs at checkpoints and stays safe against application crashes
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            batch = []
+            waiters = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                with conn:
+                    for deleting, rows in itertools.groupby(batch, key=lambda row: isinstance(row, _Delete)):
+                        if deleting:
+                            for row in rows:
+                                self._delete(conn, row.user_id)
+                            continue
+                        rows = list(rows)
+                        # A row is (message columns..., text); the text goes to texts once per hash
+                        conn.executemany('INSERT OR IGNORE INTO texts (hash, text) VALUES (?, ?)',
+                                         [(row[7], row[8]) for row in rows if row[7] is not None])
+                        conn.executemany(
+                            'INSERT INTO messages (user_id, role, content, domain, created_at, response_id, '
+                            'params, text_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                            [row[:8] for row in rows])
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                conn.close()
+                return
+
+    @staticmethod
+    def _delete(conn, user_id):
+        """Remove a user's messages, and the texts no other message shares"""
+        conn.execute('DELETE FROM texts WHERE hash IN (SELECT text_hash FROM messages WHERE user_id = ?) '
+                     'AND hash NOT IN (SELECT text_hash FROM messages WHERE user_id != ? AND text_hash IS NOT NULL)',
+                     (user_id, user_id))
+        conn.execute('DELETE FROM messages WHERE user_id = ?', (user_id,))
+
+    def append(self, user_id, role, content, domain=None, created_at=None, response=None):
+        """Queue one message for writing; returns immediately
+
+        A bot message's text is stored in the shared texts table, along with
+        the (response id, params) reference it was rendered from, if any.
+        """
+        if created_at is None:
+            created_at = now_ms()
+        response_id, params = response if response is not None else (None, None)
+        params = None if response is None else json.dumps(params, ensure_ascii=False)
+        if role == 'bot' and content:
+            self._queue.put((user_id, role, '', domain, created_at, response_id, params, text_hash(content), content))
+        else:
+            self._queue.put((user_id, role, content, domain, created_at, response_id, params, None, None))
+
+    def delete(self, user_id):
+        """Queue the removal of every message of a user; messages appended after it are kept"""
+        self._queue.put(_Delete(user_id))
+
+    def flush(self, timeout=None):
+        """Block until every message queued so far is committed"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def messages(self, user_id, since=None, until=None, limit=None):
+        """A user's messages in time order, optionally within [since, until) epoch ms and only the latest limit
+
+        Rows saved with only a reference (before reply text was stored) are
+        rendered here; every other row comes back as stored.
+        """
+        query = ('SELECT m.id, m.role, coalesce(t.text, m.content), m.domain, m.created_at, m.response_id, m.params '
+                 'FROM messages m LEFT JOIN texts t ON t.hash = m.text_hash WHERE m.user_id = ?')
+        params = [user_id]
+        if since is not None:
+            query += ' AND m.created_at >= ?'
+            params.append(since)
+        if until is not None:
+            query += ' AND m.created_at < ?'
+            params.append(until)
+        query += ' ORDER BY m.created_at DESC, m.id DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        rows = self._reader().execute(query, params).fetchall()
+        messages = []
+        for row in reversed(rows):
+            response = (row[5], tuple(json.loads(row[6]))) if row[5] is not None else None
+            messages.append({
+                'id': row[0],
+                'role': row[1],
+                'content': (row[2] or render_stored(response)) if response else row[2],
+                'domain': row[3],
+                'created_at': row[4],
+                'response': response,
+            })
+        return messages
+
+    def users(self):
+        return [row[0] for row in self._reader().execute('SELECT DISTINCT user_id FROM messages ORDER BY user_id')]
+
+    def import_json(self, path):
+        """Load a chatHistory.json file; returns the number of messages queued"""
+        with open(path, encoding='utf-8') as f:
+            history = json.load(f)
+        count = 0
+        for user_id, exchanges in history.items():
+            for exchange in exchanges:
+                # Saved chat sessions share the file but hold no user/assistant pair
+                if 'user' not in exchange or 'assistant' not in exchange:
+                    continue
+                created_at = _iso_to_ms(exchange['timestamp']) if exchange.get('timestamp') else now_ms()
+                self.append(user_id, 'user', exchange['user'], created_at=created_at)
+                self.append(user_id, 'bot', exchange['assistant'], created_at=created_at,
+                            response=find_response_ref(exchange['assistant']))
+                count += 2
+        self.flush()
+        return count
+
+    def export_json(self, path):
+        """Write every user's history as chatHistory.json exchanges"""
+        self.flush()
+        history = {}
+        for user_id in self.users():
+            exchanges = history[user_id] = []
+            for message in self.messages(user_id):
+                if message['role'] == 'user' or not exchanges or exchanges[-1]['assistant']:
+                    exchanges.append({'user': '', 'assistant': '', 'timestamp': _ms_to_iso(message['created_at'])})
+                    if message['role'] == 'user':
+                        exchanges[-1]['user'] = message['content']
+                        continue
+                exchanges[-1]['assistant'] = message['content']
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=2, ensure_ascii=False)
+        return sum(len(exchanges) for exchanges in history.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import or export chat history')
+    parser.add_argument('action', choices=('import', 'export'))
+    parser.add_argument('json_path', help='chatHistory.json file to read or write')
+    parser.add_argument('--db', default=DEFAULT_PATH, help='SQLite database path')
+    args = parser.parse_args()
+
+    store = ChatHistoryStore(args.db)
+    if args.action == 'import':
+        print(f"✅ Imported {store.import_json(args.json_path)} messages into {args.db}")
+    else:
+        print(f"✅ Exported {store.export_json(args.json_path)} exchanges to {args.json_path}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
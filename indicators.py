@@ -0,0 +1,449 @@
+"""
+Vectorized technical indicators
+SMA, EMA, RSI, MACD and Bollinger Bands computed for every bar of every
+ticker at once, with no Python loop over bars. Prices are a 1-D array of
+bars, a 2-D (tickers x bars) matrix, a pandas Series or a DataFrame with one
+column per ticker and one row per bar; results come back in the same form.
+Bars before an indicator has enough history are NaN, and so is everything
+after a gap inside a series.
+
+The Streaming* classes update the same indicators one bar at a time in O(1)
+and reproduce the batch results exactly.
+"""
+
+import io
+import math
+from collections import namedtuple
+from collections.abc import Mapping
+
+import numpy as np
+
+MACD = namedtuple('MACD', 'line signal histogram')
+BollingerBands = namedtuple('BollingerBands', 'upper middle lower')
+
+# An exponential recurrence is evaluated in closed form over blocks of bars short
+# enough that the growing weights decay**-n stay far from float64 overflow
+MAX_WEIGHT_GROWTH = 1e100
+
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _as_rows(values):
+    """(float64 array with bars along the last axis, function giving a result the input's form)"""
+    if hasattr(values, 'to_numpy'):
+        # pandas: bars along the index, tickers as columns
+        import pandas as pd
+        data = values.to_numpy(dtype=np.float64)
+        if data.ndim == 1:
+            return data, lambda result: pd.Series(result, index=values.index, name=values.name)
+        return data.T, lambda result: pd.DataFrame(result.T, index=values.index, columns=values.columns)
+    return np.asarray(values, dtype=np.float64), lambda result: result
+
+
+def _check_windows(**windows):
+    """Raise ValueError unless every window is at least one bar"""
+    for name, window in windows.items():
+        if window < 1:
+            raise ValueError(f'{name} must be at least 1 bar, got {window}')
+
+
+def _window_sums(x, window):
+    """Trailing window sums along the last axis, NaN where the window is incomplete or holds a NaN"""
+    valid = ~np.isnan(x)
+    complete_rows = valid.all()
+    padded = np.zeros(x.shape[:-1] + (x.shape[-1] + 1,))
+    np.cumsum(x if complete_rows else np.where(valid, x, 0.0), axis=-1, out=padded[..., 1:])
+    sums = np.full(x.shape, np.nan)
+    if window <= x.shape[-1]:
+        sums[..., window - 1:] = padded[..., window:] - padded[..., :-window]
+        if not complete_rows:
+            counts = np.zeros(padded.shape, dtype=np.int64)
+            np.cumsum(valid, axis=-1, out=counts[..., 1:])
+            sums[..., window - 1:][counts[..., window:] - counts[..., :-window] < window] = np.nan
+    return sums
+
+
+def _block_length(decay):
+    """Bars per block of the exponential recurrence; independent of the series length so streams can follow it"""
+    return max(1, int(math.log(MAX_WEIGHT_GROWTH) / -math.log(decay)))
+
+
+def _decay_filter(z, decay):
+    """y[t] = decay * y[t - 1] + z[t] along the last axis, starting from y[-1] = 0
+
+    Within a block, y[t] = decay**t * cumsum(z[k] * decay**-k), so each
+    block is one cumsum; the value at the end of a block carries into the next.
+    The powers are a running product, the same sequence a stream multiplies out.
+    """
+    if decay <= 0.0:
+        return z.copy()
+    n = z.shape[-1]
+    block = _block_length(decay)
+    powers = np.full(min(block, n), decay)
+    if len(powers):
+        powers[0] = 1.0
+    np.multiply.accumulate(powers, out=powers)
+    y = np.empty_like(z)
+    carry = np.zeros(z.shape[:-1])
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        head = powers[:stop - start]
+        accumulated = np.cumsum(z[..., start:stop] / head, axis=-1)
+        y[..., start:stop] = head * (accumulated + decay * carry[..., None])
+        carry = y[..., stop - 1]
+    return y
+
+
+def _ema(x, alpha, window):
+    """Exponential average with weight alpha, seeded with the mean of the first window values of each row"""
+    n = x.shape[-1]
+    valid = ~np.isnan(x)
+    first = np.where(valid.any(axis=-1), valid.argmax(axis=-1), n)
+    seed_at = first + window - 1
+    seed_window = np.minimum(first[..., None] + np.arange(window), n - 1)
+    seed = np.where(seed_at < n, np.take_along_axis(x, seed_window, axis=-1).mean(axis=-1), np.nan)
+
+    # The recurrence input is 0 before the seed, the seed itself, then alpha * x
+    z = alpha * x
+    if seed_at.size and np.all(seed_at == seed_at.flat[0]):
+        # Usually every row starts on the same bar, and plain slices do
+        start = int(seed_at.flat[0])
+        z[..., :min(start, n)] = 0.0
+        if start < n:
+            z[..., start] = seed
+        y = _decay_filter(z, 1.0 - alpha)
+        y[..., :min(start, n)] = np.nan
+        return y
+    bars = np.arange(n)
+    z[bars < seed_at[..., None]] = 0.0
+    np.put_along_axis(z, np.minimum(seed_at, n - 1)[..., None], np.where(seed_at < n, seed, 0.0)[..., None], axis=-1)
+    y = _decay_filter(z, 1.0 - alpha)
+    y[bars < seed_at[..., None]] = np.nan
+    return y
+
+
+def sma(values, window=20):
+    """Simple moving average over the trailing window bars"""
+    _check_windows(window=window)
+    x, restore = _as_rows(values)
+    return restore(_window_sums(x, window) / window)
+
+
+def ema(values, span=20):
+    """Exponential moving average with alpha = 2 / (span + 1), seeded with the SMA of the first span bars"""
+    _check_windows(span=span)
+    x, restore = _as_rows(values)
+    return restore(_ema(x, 2.0 / (span + 1), span))
+
+
+def rsi(close, period=14):
+    """Relative Strength Index with Wilder smoothing (alpha = 1 / period), from 0 to 100"""
+    _check_windows(period=period)
+    x, restore = _as_rows(close)
+    change = np.diff(x, axis=-1, prepend=np.nan)
+    # np.maximum keeps the NaN of the first bar and of gaps
+    gain = _ema(np.maximum(change, 0.0), 1.0 / period, period)
+    loss = _ema(np.maximum(-change, 0.0), 1.0 / period, period)
+    total = gain + loss
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # A flat window has neither gains nor losses and sits in the middle
+        return restore(np.where(total > 0, 100.0 * gain / total, np.where(np.isnan(total), np.nan, 50.0)))
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD line (fast EMA - slow EMA), its signal EMA and their difference"""
+    _check_windows(fast=fast, slow=slow, signal=signal)
+    x, restore = _as_rows(close)
+    line = _ema(x, 2.0 / (fast + 1), fast) - _ema(x, 2.0 / (slow + 1), slow)
+    signal_line = _ema(line, 2.0 / (signal + 1), signal)
+    return MACD(restore(line), restore(signal_line), restore(line - signal_line))
+
+
+def bollinger_bands(close, window=20, num_std=2.0):
+    """SMA of the window bars with bands num_std population standard deviations above and below"""
+    _check_windows(window=window)
+    x, restore = _as_rows(close)
+    # Centre each series on its first price before summing squares, so the
+    # variance does not cancel out at price scale
+    centre = np.nan_to_num(np.take_along_axis(x, (~np.isnan(x)).argmax(axis=-1)[..., None], axis=-1))
+    centred = x - centre
+    mean = _window_sums(centred, window) / window
+    variance = np.maximum(_window_sums(centred * centred, window) / window - mean * mean, 0.0)
+    middle = mean + centre
+    spread = num_std * np.sqrt(variance)
+    return BollingerBands(restore(middle + spread), restore(middle), restore(middle - spread))
+
+
+def latest(values):
+    """Value of each series on the last bar: a scalar for one series, else one per ticker
+
+    NaN when a series has no value there (too little history, or a gap since
+    its indicators last had one); an older value is never passed off as current.
+    """
+    x, _ = _as_rows(values)
+    return x[..., -1] if x.shape[-1] else np.full(x.shape[:-1], np.nan)
+
+
+# Streaming
+# Each class follows one series bar by bar in O(1) time, with state bounded
+# by its window. The arithmetic mirrors the batch functions step for step
+# (the same running totals and the same blocked exponential recurrence), so
+# a stream reproduces the batch values exactly. to_state() returns plain
+# JSON-compatible values and from_state() resumes from them.
+def _close(bar):
+    """Close price of a bar given as a number, an OHLCV mapping or an (open, high, low, close, ...) sequence"""
+    if isinstance(bar, Mapping):
+        return float(bar['close'])
+    if isinstance(bar, (tuple, list)):
+        return float(bar[3])
+    return float(bar)
+
+
+class _StreamState:
+    """to_state() / from_state() over __slots__; parts names the slots holding nested streams"""
+
+    __slots__ = ()
+    parts = {}
+
+    def to_state(self):
+        state = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            state[name] = value.to_state() if name in self.parts else list(value) if isinstance(value, list) else value
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        stream = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = state[name]
+            setattr(stream, name, cls.parts[name].from_state(value) if name in cls.parts
+                    else list(value) if isinstance(value, list) else value)
+        return stream
+
+
+class _WindowSum(_StreamState):
+    """Trailing window sum as the difference of two running totals, like _window_sums"""
+
+    __slots__ = ('window', 'bars', 'totals', 'counts')
+
+    def __init__(self, window):
+        self.window = window
+        self.bars = 0
+        # Running totals (NaN counted as 0) and valid counts of the last window + 1 bars, as a ring
+        self.totals = [0.0] * (window + 1)
+        self.counts = [0] * (window + 1)
+
+    def update(self, x):
+        size = self.window + 1
+        valid = not math.isnan(x)
+        total = self.totals[self.bars % size] + (x if valid else 0.0)
+        count = self.counts[self.bars % size] + valid
+        self.bars += 1
+        self.totals[self.bars % size] = total
+        self.counts[self.bars % size] = count
+        if self.bars < self.window:
+            return math.nan
+        start = (self.bars - self.window) % size
+        return total - self.totals[start] if count - self.counts[start] == self.window else math.nan
+
+
+class _ExponentialState(_StreamState):
+    """Exponential average one bar at a time, following _ema and _decay_filter"""
+
+    __slots__ = ('alpha', 'window', 'decay', 'block', 'bars', 'seed_at', 'pending', 'power', 'accumulated', 'carry')
+
+    def __init__(self, alpha, window):
+        self.alpha = alpha
+        self.window = window
+        self.decay = 1.0 - alpha
+        self.block = _block_length(self.decay) if self.decay > 0.0 else 1
+        self.bars = 0
+        self.seed_at = None
+        # Values averaged into the seed, held only until it is reached
+        self.pending = []
+        self.power = 1.0
+        self.accumulated = 0.0
+        self.carry = 0.0
+
+    def update(self, x):
+        t = self.bars
+        self.bars += 1
+        if self.seed_at is None and not math.isnan(x):
+            self.seed_at = t + self.window - 1
+        if self.seed_at is None or t < self.seed_at:
+            z = 0.0
+            if self.seed_at is not None:
+                self.pending.append(x)
+        elif t == self.seed_at:
+            self.pending.append(x)
+            z = float(np.mean(self.pending))
+            self.pending = []
+        else:
+            z = self.alpha * x
+
+        if self.decay <= 0.0:
+            y = z
+        else:
+            position = t % self.block
+            self.power = 1.0 if position == 0 else self.power * self.decay
+            term = z / self.power
+            self.accumulated = term if position == 0 else self.accumulated + term
+            y = self.power * (self.accumulated + self.decay * self.carry)
+            if position == self.block - 1:
+                self.carry = y
+        return y if self.seed_at is not None and t >= self.seed_at else math.nan
+
+
+class StreamingSMA(_StreamState):
+    """sma() one bar at a time"""
+
+    __slots__ = ('sums',)
+    parts = {'sums': _WindowSum}
+
+    def __init__(self, window=20):
+        _check_windows(window=window)
+        self.sums = _WindowSum(window)
+
+    def update(self, bar):
+        return self.sums.update(_close(bar)) / self.sums.window
+
+
+class StreamingEMA(_StreamState):
+    """ema() one bar at a time"""
+
+    __slots__ = ('average',)
+    parts = {'average': _ExponentialState}
+
+    def __init__(self, span=20):
+        _check_windows(span=span)
+        self.average = _ExponentialState(2.0 / (span + 1), span)
+
+    def update(self, bar):
+        return self.average.update(_close(bar))
+
+
+class StreamingRSI(_StreamState):
+    """rsi() one bar at a time: the previous close and Wilder averages of gains and losses"""
+
+    __slots__ = ('previous', 'gain', 'loss')
+    parts = {'gain': _ExponentialState, 'loss': _ExponentialState}
+
+    def __init__(self, period=14):
+        _check_windows(period=period)
+        self.previous = math.nan
+        self.gain = _ExponentialState(1.0 / period, period)
+        self.loss = _ExponentialState(1.0 / period, period)
+
+    def update(self, bar):
+        close = _close(bar)
+        change = close - self.previous
+        self.previous = close
+        gain = self.gain.update(change if math.isnan(change) else max(change, 0.0))
+        loss = self.loss.update(change if math.isnan(change) else max(-change, 0.0))
+        total = gain + loss
+        if total > 0:
+            return 100.0 * gain / total
+        return math.nan if math.isnan(total) else 50.0
+
+
+class StreamingMACD(_StreamState):
+    """macd() one bar at a time"""
+
+    __slots__ = ('fast', 'slow', 'signal')
+    parts = {'fast': _ExponentialState, 'slow': _ExponentialState, 'signal': _ExponentialState}
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        _check_windows(fast=fast, slow=slow, signal=signal)
+        self.fast = _ExponentialState(2.0 / (fast + 1), fast)
+        self.slow = _ExponentialState(2.0 / (slow + 1), slow)
+        self.signal = _ExponentialState(2.0 / (signal + 1), signal)
+
+    def update(self, bar):
+        close = _close(bar)
+        line = self.fast.update(close) - self.slow.update(close)
+        signal_line = self.signal.update(line)
+        return MACD(line, signal_line, line - signal_line)
+
+
+class StreamingBollinger(_StreamState):
+    """bollinger_bands() one bar at a time: the first price as centre and window sums of deviations from it"""
+
+    __slots__ = ('num_std', 'centre', 'sums', 'squares')
+    parts = {'sums': _WindowSum, 'squares': _WindowSum}
+
+    def __init__(self, window=20, num_std=2.0):
+        _check_windows(window=window)
+        self.num_std = num_std
+        self.centre = math.nan
+        self.sums = _WindowSum(window)
+        self.squares = _WindowSum(window)
+
+    def update(self, bar):
+        close = _close(bar)
+        if math.isnan(self.centre) and not math.isnan(close):
+            self.centre = close
+        centred = close - self.centre
+        window = self.sums.window
+        mean = self.sums.update(centred) / window
+        variance = self.squares.update(centred * centred) / window - mean * mean
+        variance = 0.0 if variance < 0.0 else variance
+        middle = mean + self.centre
+        spread = self.num_std * math.sqrt(variance)
+        return BollingerBands(middle + spread, middle, middle - spread)
+
+
+class IndicatorStream(_StreamState):
+    """Every indicator of one series with default settings, updated together; update() returns them by name"""
+
+    __slots__ = ('sma', 'ema', 'rsi', 'macd', 'bollinger')
+    parts = {'sma': StreamingSMA, 'ema': StreamingEMA, 'rsi': StreamingRSI, 'macd': StreamingMACD,
+             'bollinger': StreamingBollinger}
+
+    def __init__(self):
+        for name, cls in self.parts.items():
+            setattr(self, name, cls())
+
+    def update(self, bar):
+        close = _close(bar)
+        return {name: getattr(self, name).update(close) for name in self.__slots__}
+
+
+def read_ohlcv(source):
+    """{field: DataFrame of dates x tickers} from a CSV of OHLCV bars
+
+    Long files have open/high/low/close/volume columns (any case), a date
+    column and optionally a ticker or symbol column. Wide files have a date
+    column and one close column per ticker. Rows are sorted by date.
+    """
+    import pandas as pd
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    frame = pd.read_csv(source)
+    columns = {str(column).strip().lower(): column for column in frame.columns}
+    date = next((columns[name] for name in ('date', 'datetime', 'timestamp', 'time') if name in columns), None)
+    if date is not None:
+        frame[date] = pd.to_datetime(frame[date], errors='coerce')
+    ticker = next((columns[name] for name in ('ticker', 'symbol') if name in columns), None)
+
+    if 'close' in columns or 'adj close' in columns:
+        fields = {field: columns[field] for field in OHLCV_FIELDS if field in columns}
+        fields.setdefault('close', columns.get('adj close'))
+        # Unreadable values (e.g. 'n/a' or '1,234.5') become missing bars rather than text prices
+        frame = frame.assign(**{column: pd.to_numeric(frame[column], errors='coerce') for column in fields.values()})
+        if frame[fields['close']].isna().all():
+            raise ValueError('The close column has no numeric prices')
+        if ticker is None:
+            frame = frame.assign(**{'ticker': 'data'})
+            ticker = 'ticker'
+        index = date if date is not None else frame.groupby(ticker).cumcount()
+        return {field: frame.pivot_table(index=index, columns=ticker, values=column, aggfunc='last').sort_index()
+                for field, column in fields.items()}
+
+    # Wide: a close price column per ticker
+    if date is not None:
+        frame = frame.set_index(date)
+    prices = frame.apply(pd.to_numeric, errors='coerce').dropna(axis=1, how='all')
+    if prices.empty:
+        raise ValueError('No price columns found; expected a close column or one numeric column per ticker')
+    return {'close': prices.sort_index()}
@@ -0,0 +1,480 @@
+"""
+Ranking engines for the knowledge search
+Documents are tokenized once and stored as per-term postings arrays (a
+sparse term-document matrix), so scoring a batch of queries is a single
+vectorized accumulation followed by an argpartition. BM25Index ranks whole
+words; HashedNgramIndex scores cosine similarity of hashed character and
+word n-gram vectors, which tolerates misspellings and paraphrases.
+SpellingIndex maps a misspelled word to the vocabulary term it was meant
+to be through SymSpell deletion lookups.
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:/[a-z0-9]+)*")
+
+# Upper bound on the dense (queries x documents) score block built per pass
+MAX_SCORE_CELLS = 1 << 22
+
+# Bound on the words a SpellingIndex remembers corrections for, since they come from user text
+MAX_REMEMBERED_WORDS = 1 << 16
+# Marks a word with no remembered correction (None means it needs none)
+_NOT_REMEMBERED = object()
+
+
+def tokenize(text, stopwords=frozenset()):
+    """Split text into lowercase word terms; 'p/e' also yields 'pe'"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in stopwords:
+            continue
+        tokens.append(token)
+        if '/' in token:
+            tokens.append(token.replace('/', ''))
+    return tokens
+
+
+def accumulate_postings(indptr, doc_ids, weights, rows, terms, n_queries, n_docs, term_weights=None):
+    """Dense (n_queries, n_docs) float32 scores summing the postings of each (query row, term) pair"""
+    scores = np.zeros((n_queries, n_docs), dtype=np.float32)
+    if not len(terms):
+        return scores
+
+    # Expand every (query, term) pair into its postings range without a Python loop
+    terms = np.asarray(terms, dtype=np.int64)
+    starts = indptr[terms]
+    counts = indptr[terms + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    positions = offsets + np.arange(counts.sum())
+    cells = np.repeat(np.asarray(rows, dtype=np.int64), counts) * n_docs + doc_ids[positions]
+    values = weights[positions]
+    if term_weights is not None:
+        values = values * np.repeat(np.asarray(term_weights, dtype=np.float32), counts)
+    scores.ravel()[:] = np.bincount(cells, weights=values, minlength=scores.size)
+    return scores
+
+
+def top_k(scores, k, threshold=0.0):
+    """Best (doc_id, score) pairs of each row of a score matrix, best first, keeping scores above threshold"""
+    n_docs = scores.shape[1]
+    k = min(k, n_docs)
+    if k <= 0:
+        return [[] for _ in range(len(scores))]
+    if k < n_docs:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(n_docs), scores.shape)
+    # Order the k candidates by score, breaking ties by document order
+    top = np.sort(top, axis=1)
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    return [[(doc_id, score) for doc_id, score in zip(ids, values) if score > threshold]
+            for ids, values in zip(top.tolist(), top_scores.tolist())]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents
+
+    A document is either a string or a sequence of field strings; with
+    field_weights, a term occurring in field i counts field_weights[i] times.
+    """
+
+    def __init__(self, documents, stopwords=frozenset(), k1=1.5, b=0.75, field_weights=None):
+        self.stopwords = frozenset(stopwords)
+        self.k1 = k1
+        self.b = b
+
+        vocabulary = {}
+        term_ids = []
+        doc_ids = []
+        counts = []
+        lengths = []
+        for doc_id, fields in enumerate(documents):
+            if isinstance(fields, str):
+                fields = (fields,)
+            length = 0.0
+            for field, text in enumerate(fields):
+                weight = field_weights[field] if field_weights else 1.0
+                tokens = tokenize(text, self.stopwords)
+                length += weight * len(tokens)
+                for token in tokens:
+                    term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                    doc_ids.append(doc_id)
+                    counts.append(weight)
+            lengths.append(length)
+
+        self.vocabulary = vocabulary
+        self.n_docs = len(lengths)
+        n_terms = len(vocabulary)
+
+        # Collapse (term, doc) occurrences into weighted term frequencies, grouped by term
+        stride = max(self.n_docs, 1)
+        pair_keys = np.asarray(term_ids, dtype=np.int64) * stride + np.asarray(doc_ids, dtype=np.int64)
+        pairs, inverse = np.unique(pair_keys, return_inverse=True)
+        tf = np.bincount(inverse, weights=np.asarray(counts, dtype=np.float64), minlength=len(pairs))
+        posting_terms = pairs // stride
+        posting_docs = pairs % stride
+
+        doc_len = np.asarray(lengths, dtype=np.float64)
+        avg_len = doc_len.mean() if self.n_docs and doc_len.mean() > 0 else 1.0
+        df = np.bincount(posting_terms, minlength=n_terms)
+        self.idf = np.log1p((self.n_docs - df + 0.5) / (df + 0.5))
+
+        norm = k1 * (1.0 - b + b * doc_len[posting_docs] / avg_len)
+        weights = self.idf[posting_terms] * tf * (k1 + 1.0) / (tf + norm)
+
+        self._indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(df, out=self._indptr[1:])
+        self._doc_ids = posting_docs.astype(np.int32)
+        self._weights = weights.astype(np.float32)
+
+    @classmethod
+    def from_arrays(cls, vocabulary, indptr, doc_ids, weights, n_docs, stopwords=frozenset(), k1=1.5, b=0.75):
+        """Rebuild an index from its postings, e.g. memory-mapped from a compiled artifact
+
+        vocabulary only needs get(term) returning the term id, or None.
+        """
+        index = cls.__new__(cls)
+        index.stopwords = frozenset(stopwords)
+        index.k1 = k1
+        index.b = b
+        index.vocabulary = vocabulary
+        index.n_docs = n_docs
+        index.idf = None
+        index._indptr = indptr
+        index._doc_ids = doc_ids
+        index._weights = weights
+        return index
+
+    def to_arrays(self):
+        """(terms ordered by id, indptr, doc_ids, weights) for from_arrays"""
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        return terms, self._indptr, self._doc_ids, self._weights
+
+    def postings(self, term):
+        """Ids of the documents containing term"""
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            return self._doc_ids[:0]
+        return self._doc_ids[self._indptr[term_id]:self._indptr[term_id + 1]]
+
+    def score_batch(self, queries):
+        """Dense (len(queries), n_docs) matrix of BM25 scores"""
+        rows = []
+        terms = []
+        for row, query in enumerate(queries):
+            for token in tokenize(query, self.stopwords):
+                term_id = self.vocabulary.get(token)
+                if term_id is not None:
+                    rows.append(row)
+                    terms.append(term_id)
+
+        return accumulate_postings(self._indptr, self._doc_ids, self._weights, rows, terms, len(queries), self.n_docs)
+
+    def search(self, query, k=10):
+        """Top-k (doc_id, score) pairs for one query, best first"""
+        return self.search_batch([query], k)[0]
+
+    def search_batch(self, queries, k=10):
+        """Top-k (doc_id, score) pairs for each query, best first"""
+        queries = list(queries)
+        results = []
+        block = max(1, MAX_SCORE_CELLS // max(self.n_docs, 1))
+        for start in range(0, len(queries), block):
+            results.extend(top_k(self.score_batch(queries[start:start + block]), k))
+        return results
+
+
+# FNV-1a over the bytes of each character n-gram, then a murmur3 finalizer so the low
+# bits that pick the bucket are well mixed; word n-grams use crc32 with another seed
+FNV_OFFSET = np.uint32(0x811C9DC5)
+FNV_PRIME = np.uint32(0x01000193)
+WORD_NGRAM_SEED = 0x5BD1E995
+
+
+def _mix(hashes):
+    hashes ^= hashes >> np.uint32(16)
+    hashes *= np.uint32(0x85EBCA6B)
+    hashes ^= hashes >> np.uint32(13)
+    hashes *= np.uint32(0xC2B2AE35)
+    hashes ^= hashes >> np.uint32(16)
+    return hashes
+
+
+def ngram_features(text, n_features, char_ngrams=(3, 4), word_ngrams=(1, 2), stopwords=frozenset()):
+    """Hashed feature ids of the character n-grams of each word of text and of its word n-grams
+
+    Words are padded with a space on each side so prefixes and suffixes get
+    their own grams. Character grams of all words are hashed in one
+    vectorized pass; the hashes are stable across processes.
+    """
+    words = tokenize(text, stopwords)
+    if not words:
+        return np.zeros(0, dtype=np.int64)
+    padded = np.frombuffer(f" {' '.join(words)} ".encode('utf-8'), dtype=np.uint8).astype(np.uint32)
+    is_space = padded == ord(' ')
+    # Extend every gram by one byte per pass, emitting them at each requested length
+    hashes = []
+    gram = np.full(len(padded), FNV_OFFSET, dtype=np.uint32)
+    spans_words = np.zeros(len(padded), dtype=bool)
+    for j in range(char_ngrams[1]):
+        count = len(padded) - j
+        if count <= 0:
+            break
+        gram = (gram[:count] ^ padded[j:]) * FNV_PRIME
+        if j >= char_ngrams[0] - 1:
+            hashes.append(_mix(gram.copy())[~spans_words[:count]])
+        # A space inside a gram (not at either end) means it spans two words
+        if j:
+            spans_words = spans_words[:count] | is_space[j:]
+    hashes.append(np.fromiter((zlib.crc32(' '.join(words[i:i + n]).encode('utf-8'), WORD_NGRAM_SEED)
+                               for n in range(word_ngrams[0], word_ngrams[1] + 1)
+                               for i in range(len(words) - n + 1)), dtype=np.uint32))
+    return np.concatenate(hashes).astype(np.int64) % n_features
+
+
+class HashedNgramIndex:
+    """Cosine similarity over hashed character and word n-gram tf-idf vectors
+
+    Needs no model or network. Each document is a sparse, L2-normalized
+    vector over n_features hash buckets, stored bucket-major like BM25
+    postings, so a query only touches documents that share a bucket with
+    it. Buckets found in more than max_df of the documents (and more than
+    min_df_cut of them) are treated like stopwords: they carry little
+    weight and would make every query scan most of the corpus.
+    """
+
+    def __init__(self, documents, stopwords=frozenset(), field_weights=None, n_features=1 << 18,
+                 char_ngrams=(3, 4), word_ngrams=(1, 2), max_df=0.05, min_df_cut=64):
+        self.stopwords = frozenset(stopwords)
+        self.n_features = n_features
+        self.char_ngrams = tuple(char_ngrams)
+        self.word_ngrams = tuple(word_ngrams)
+
+        features = []
+        doc_ids = []
+        counts = []
+        n_docs = 0
+        for doc_id, fields in enumerate(documents):
+            if isinstance(fields, str):
+                fields = (fields,)
+            for field, text in enumerate(fields):
+                field_features = self._features(text)
+                features.append(field_features)
+                doc_ids.append(np.full(len(field_features), doc_id, dtype=np.int64))
+                counts.append(np.full(len(field_features), field_weights[field] if field_weights else 1.0))
+            n_docs = doc_id + 1
+        self.n_docs = n_docs
+
+        # Collapse occurrences into (feature, doc) term frequencies, grouped by feature
+        stride = max(n_docs, 1)
+        pair_keys = (np.concatenate(features) * stride + np.concatenate(doc_ids)) if features else np.zeros(0, dtype=np.int64)
+        pairs, inverse = np.unique(pair_keys, return_inverse=True)
+        tf = np.bincount(inverse, weights=np.concatenate(counts) if counts else None, minlength=len(pairs))
+        posting_features = pairs // stride
+        posting_docs = pairs % stride
+
+        # Buckets in too many documents get no weight at all, in documents or queries
+        df = np.bincount(posting_features, minlength=n_features)
+        idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+        idf[df > max(max_df * n_docs, min_df_cut)] = 0.0
+        self.idf = idf.astype(np.float32)
+        weights = (1.0 + np.log(tf)) * idf[posting_features]
+        norms = np.sqrt(np.bincount(posting_docs, weights=weights * weights, minlength=n_docs))
+        weights /= np.maximum(norms, 1e-12)[posting_docs]
+
+        keep = weights > 0
+        posting_features = posting_features[keep]
+        self._indptr = np.zeros(n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(posting_features, minlength=n_features), out=self._indptr[1:])
+        self._doc_ids = posting_docs[keep].astype(np.int32)
+        self._weights = weights[keep].astype(np.float32)
+
+    @classmethod
+    def from_arrays(cls, idf, indptr, doc_ids, weights, n_docs, stopwords=frozenset(), char_ngrams=(3, 4), word_ngrams=(1, 2)):
+        """Rebuild an index from its arrays, e.g. memory-mapped from a compiled artifact"""
+        index = cls.__new__(cls)
+        index.stopwords = frozenset(stopwords)
+        index.n_features = len(idf)
+        index.char_ngrams = tuple(char_ngrams)
+        index.word_ngrams = tuple(word_ngrams)
+        index.n_docs = n_docs
+        index.idf = idf
+        index._indptr = indptr
+        index._doc_ids = doc_ids
+        index._weights = weights
+        return index
+
+    def to_arrays(self):
+        """(idf, indptr, doc_ids, weights) for from_arrays"""
+        return self.idf, self._indptr, self._doc_ids, self._weights
+
+    def _features(self, text):
+        return ngram_features(text, self.n_features, self.char_ngrams, self.word_ngrams, self.stopwords)
+
+    def score_batch(self, queries):
+        """Dense (len(queries), n_docs) matrix of cosine similarities"""
+        rows = []
+        terms = []
+        term_weights = []
+        for row, query in enumerate(queries):
+            features, counts = np.unique(self._features(query), return_counts=True)
+            weights = (1.0 + np.log(counts)) * self.idf[features]
+            norm = np.sqrt(np.dot(weights, weights))
+            rows.append(np.full(len(features), row, dtype=np.int64))
+            terms.append(features)
+            term_weights.append(weights / norm if norm > 0 else weights)
+        if not terms:
+            return np.zeros((0, self.n_docs), dtype=np.float32)
+        return accumulate_postings(self._indptr, self._doc_ids, self._weights, np.concatenate(rows),
+                                   np.concatenate(terms), len(queries), self.n_docs, np.concatenate(term_weights))
+
+    def search(self, query, k=10, threshold=0.0):
+        """Top-k (doc_id, similarity) pairs for one query, best first"""
+        return self.search_batch([query], k, threshold)[0]
+
+    def search_batch(self, queries, k=10, threshold=0.0):
+        """Top-k (doc_id, similarity) pairs above threshold for each query, best first"""
+        queries = list(queries)
+        results = []
+        block = max(1, MAX_SCORE_CELLS // max(self.n_docs, 1))
+        for start in range(0, len(queries), block):
+            results.extend(top_k(self.score_batch(queries[start:start + block]), k, threshold))
+        return results
+
+
+def deletes(word, distance):
+    """Every string obtained by deleting up to distance characters of word, word included"""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (an adjacent swap is one edit), or limit + 1 once above limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class SpellingIndex:
+    """SymSpell lookup of the vocabulary term a misspelled word was meant to be
+
+    Every term is stored under each string obtained by deleting one (or, for
+    long terms, two) of its characters. A word's candidates are the terms
+    sharing one of its own deletes, so a lookup costs a few dict probes
+    whatever the size of the vocabulary; candidates are then checked with a
+    true edit distance.
+
+    Ordinary English must not be rewritten into finance terms, so words
+    listed as known (any word of the content, plus common words that happen
+    to be close to a term) are left alone, as are short words, numbers,
+    words whose first letter differs and inflections of a term (which
+    already match it). A changed letter, as in stack/stock, only counts as
+    a typo in words of substitution_length or more. Ties go to the term
+    listed first.
+    """
+
+    def __init__(self, terms, known_words=(), min_length=5, substitution_length=7, long_length=9):
+        self.min_length = min_length
+        self.substitution_length = substitution_length
+        self.long_length = long_length
+        self.terms = list(dict.fromkeys(t for t in terms if t.isalpha() and len(t) >= min_length))
+        self.known = {word: i for i, word in enumerate(dict.fromkeys([*self.terms, *known_words]))}
+
+        # Terms within two edits of a long word are at least long_length - 2 characters
+        postings = {}
+        for term_id, term in enumerate(self.terms):
+            for key in deletes(term, 2 if len(term) >= long_length - 2 else 1):
+                postings.setdefault(key, []).append(term_id)
+        self.deletes = {key: i for i, key in enumerate(postings)}
+        self._postings = list(postings.values())
+        self._corrections = {}
+
+    @classmethod
+    def from_arrays(cls, terms, delete_keys, postings, known, min_length=5, substitution_length=7, long_length=9):
+        """Rebuild an index from its tables, e.g. memory-mapped from a compiled artifact
+
+        delete_keys and known only need get(word) returning a position or
+        None; postings[i] lists the term ids stored under delete key i.
+        """
+        index = cls.__new__(cls)
+        index.min_length = min_length
+        index.substitution_length = substitution_length
+        index.long_length = long_length
+        index.terms = terms
+        index.known = known
+        index.deletes = delete_keys
+        index._postings = postings
+        index._corrections = {}
+        return index
+
+    def to_arrays(self):
+        """(terms, delete keys ordered by id, term id rows per key, known words) for from_arrays"""
+        return self.terms, list(self.deletes), self._postings, list(self.known)
+
+    def correct(self, word):
+        """The term word is a misspelling of, or None when it is known, too short or has no close term"""
+        term = self._corrections.get(word, _NOT_REMEMBERED)
+        if term is not _NOT_REMEMBERED:
+            return term
+        term = None
+        if len(word) >= self.min_length and word.isalpha() and self.known.get(word) is None:
+            limit = 2 if len(word) >= self.long_length else 1
+            candidates = set()
+            for key in deletes(word, limit):
+                position = self.deletes.get(key)
+                if position is not None:
+                    candidates.update(self._postings[position])
+            best = None
+            for term_id in candidates:
+                candidate = self.terms[term_id]
+                if candidate[0] != word[0] or word.startswith(candidate):
+                    continue
+                if (len(candidate) == len(word) < self.substitution_length
+                        and sorted(candidate) != sorted(word)):
+                    continue
+                distance = edit_distance(word, candidate, limit)
+                if distance <= limit and (best is None or (distance, term_id) < best):
+                    best = (distance, term_id)
+            term = self.terms[best[1]] if best else None
+        if len(self._corrections) >= MAX_REMEMBERED_WORDS:
+            self._corrections.clear()
+        self._corrections[word] = term
+        return term
+
+    def correct_text(self, text):
+        """(lowercased text with misspelled words replaced, [(word, term)] corrections made)"""
+        text = text.lower()
+        remembered = self._corrections
+        corrections = []
+        for word in TOKEN_PATTERN.findall(text):
+            term = remembered.get(word, _NOT_REMEMBERED)
+            if term is _NOT_REMEMBERED:
+                term = self.correct(word)
+            if term is not None:
+                corrections.append((word, term))
+        if corrections:
+            replacements = dict(corrections)
+            text = TOKEN_PATTERN.sub(lambda match: replacements.get(match.group(), match.group()), text)
+        return text, corrections
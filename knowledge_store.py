@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+"""
+Compiled knowledge content
+Answer texts, routing rules, the stock knowledge base and tips live in a
+versioned data file, knowledge/content.json. It is compiled into a binary
+index artifact (string tables, the routing rule table, the phrase automaton,
+the BM25 postings and the spelling dictionary) that is memory-mapped at
+startup, so loading costs the same however large the catalogue grows and
+entries are decoded when used.
+KnowledgeWatcher recompiles the content in the background when it changes.
+
+    python knowledge_store.py build
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from types import MappingProxyType
+
+import numpy as np
+
+from knowledge_search import BM25Index, HashedNgramIndex, SpellingIndex, tokenize
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge')
+CONTENT_FILE = 'content.json'
+INDEX_FILE = 'content.idx'
+
+# Bump when the artifact layout changes; older artifacts are rebuilt on load
+INDEX_FORMAT = 3
+MAGIC = b'ZENOKB01'
+ALIGNMENT = 64
+
+# Bound on the lookups a StringTable remembers, since keys come from user text
+MAX_REMEMBERED_KEYS = 1 << 16
+
+
+def freeze(value):
+    """Recursively convert dicts and lists into read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+# Artifact building blocks
+class StringTable:
+    """Read-only sequence of strings stored as one UTF-8 blob plus offsets
+
+    With a hash index, get(key) finds a string's position without decoding
+    the table or building a dict. Recent lookups, found or not, are remembered.
+    """
+
+    def __init__(self, offsets, blob, slots=None):
+        self._offsets = offsets
+        self._blob = blob
+        self._slots = slots
+        self._seen = {}
+
+    @staticmethod
+    def encode(strings, hashed=False):
+        """(offsets, blob, slots) arrays for strings"""
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        if not hashed:
+            return offsets, blob, None
+        # Open addressing at load factor <= 0.5; a slot holds position + 1, 0 is empty
+        mask = (1 << max(3, (2 * len(encoded) - 1).bit_length())) - 1
+        slots = np.zeros(mask + 1, dtype=np.int32)
+        for position, key in enumerate(encoded):
+            slot = zlib.crc32(key) & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = position + 1
+        return offsets, blob, slots
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('string table index out of range')
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def get(self, key, default=None):
+        """Position of key, or default"""
+        position = self._seen.get(key)
+        if position is None:
+            position = self._probe(key.encode('utf-8'))
+            if len(self._seen) >= MAX_REMEMBERED_KEYS:
+                self._seen.clear()
+            self._seen[key] = position
+        return default if position < 0 else position
+
+    def _probe(self, encoded):
+        slots, offsets, blob = self._slots, self._offsets, self._blob
+        mask = len(slots) - 1
+        slot = zlib.crc32(encoded) & mask
+        while True:
+            position = slots[slot] - 1
+            if position < 0 or blob[offsets[position]:offsets[position + 1]] == encoded:
+                return position
+            slot = (slot + 1) & mask
+
+
+class CSR:
+    """Rows of ints stored as an indptr array and one flat values array"""
+
+    def __init__(self, indptr, values):
+        self._indptr = indptr
+        self._values = values
+
+    @staticmethod
+    def encode(rows, dtype=np.int32):
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        values = np.fromiter((v for row in rows for v in row), dtype=dtype, count=int(indptr[-1]))
+        return indptr, values
+
+    def __len__(self):
+        return len(self._indptr) - 1
+
+    def __getitem__(self, row):
+        return self._values[self._indptr[row]:self._indptr[row + 1]]
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton reporting the id of every phrase that occurs in a text
+
+    The trie, failure links and outputs are flat arrays. A state's full
+    transition row is built from its failure state's row the first time a
+    scan reaches it, so a memory-mapped automaton costs nothing until used.
+    """
+
+    def __init__(self, edge_indptr, edge_chars, edge_targets, fail, outputs):
+        self._edge_indptr = edge_indptr
+        self._edge_chars = edge_chars
+        self._edge_targets = edge_targets
+        self._fail = fail
+        self._outputs = outputs
+        self._delta = [None] * len(fail)
+        self._out = [None] * len(fail)
+
+    @staticmethod
+    def compile(phrases):
+        """Arrays of the automaton for a list of phrases; a phrase id is its position"""
+        goto = [{}]
+        output = [set()]
+        for phrase_id, phrase in enumerate(phrases):
+            state = 0
+            for ch in phrase:
+                if ch not in goto[state]:
+                    goto.append({})
+                    output.append(set())
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            output[state].add(phrase_id)
+
+        # Breadth-first pass for failure links, merging each state's outputs with its fallback's
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            output[state] |= output[fail[state]]
+            for ch, child in goto[state].items():
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(ch, 0)
+                fail[child] = target if target != child else 0
+                queue.append(child)
+
+        rows = [sorted(edges.items()) for edges in goto]
+        edge_indptr, edge_targets = CSR.encode([[target for _, target in row] for row in rows])
+        output_indptr, output_phrases = CSR.encode([sorted(out) for out in output])
+        return {
+            'edge_indptr': edge_indptr,
+            'edge_chars': np.asarray([ord(ch) for row in rows for ch, _ in row], dtype=np.int32),
+            'edge_targets': edge_targets,
+            'fail': np.asarray(fail, dtype=np.int32),
+            'output_indptr': output_indptr,
+            'output_phrases': output_phrases,
+        }
+
+    def _row(self, state):
+        """Full transition row of a state: its trie edges over its failure state's row"""
+        start, stop = self._edge_indptr[state], self._edge_indptr[state + 1]
+        row = {}
+        if state:
+            fallback = self._fail[state]
+            row.update(self._delta[fallback] or self._row(fallback))
+        row.update(zip(map(chr, self._edge_chars[start:stop]), self._edge_targets[start:stop]))
+        self._out[state] = frozenset(self._outputs[state])
+        self._delta[state] = row
+        return row
+
+    def scan(self, text):
+        """Return the set of phrase ids found in text (overlapping matches included)"""
+        delta, outs = self._delta, self._out
+        hits = set()
+        row = delta[0] or self._row(0)
+        for ch in text:
+            state = row.get(ch, 0)
+            row = delta[state] or self._row(state)
+            if outs[state]:
+                hits |= outs[state]
+        return hits
+
+
+# Compiling content into an index artifact
+_VIEW_FORMATS = {'int64': 'q', 'int32': 'i', 'uint8': 'B', 'float32': 'f', 'float64': 'd'}
+
+
+def _string_sections(name, strings, hashed=False):
+    offsets, blob, slots = StringTable.encode(strings, hashed)
+    sections = {f'{name}.offsets': offsets, f'{name}.blob': blob}
+    if hashed:
+        sections[f'{name}.slots'] = slots
+    return sections
+
+
+def _flatten_rules(content):
+    """Routing rules in priority order as (response id, domain, [phrase groups], veto phrases)"""
+    rules = [(rule_id, domain, [list(g) for g in groups], list(veto))
+             for rule_id, domain, groups, veto in content['intent_rules']]
+    universal_start = len(rules)
+
+    # A category only owns a query when no earlier category was triggered,
+    # so each topic rule is vetoed by the triggers of the categories above it.
+    earlier_triggers = []
+    for triggers, topics in content['universal_categories']:
+        for rule_id, phrases in topics:
+            groups = [list(triggers)]
+            if phrases:
+                groups.append(list(phrases))
+            rules.append((rule_id, None, groups, list(dict.fromkeys(earlier_triggers))))
+        earlier_triggers.extend(triggers)
+    return rules, universal_start, earlier_triggers
+
+
+def compile_content(content):
+    """(header fields, {section name: array}) of the index for parsed content"""
+    if content.get('format') != 1:
+        raise ValueError(f"Unsupported content format: {content.get('format')!r}")
+    sections = {}
+
+    response_ids = list(content['intent_responses'])
+    sections.update(_string_sections('response_ids', response_ids, hashed=True))
+    sections.update(_string_sections('response_texts', content['intent_responses'].values()))
+    response_index = {response_id: i for i, response_id in enumerate(response_ids)}
+
+    # Rule table over phrase ids; the automaton reports those ids
+    rules, universal_start, triggers = _flatten_rules(content)
+    phrases = set(content['stock_keywords']) | set(triggers)
+    for _, _, groups, veto in rules:
+        phrases.update(veto)
+        for group in groups:
+            phrases.update(group)
+    phrases = sorted(phrases)
+    phrase_index = {phrase: i for i, phrase in enumerate(phrases)}
+    sections.update(_string_sections('phrases', phrases))
+    sections.update({f'matcher.{name}': array for name, array in PhraseMatcher.compile(phrases).items()})
+
+    domains = sorted({domain for _, domain, _, _ in rules if domain is not None})
+    sections['rules.response'] = np.asarray([response_index[rule_id] for rule_id, _, _, _ in rules], dtype=np.int32)
+    sections['rules.domain'] = np.asarray([domains.index(domain) if domain else -1 for _, domain, _, _ in rules], dtype=np.int32)
+    groups = [[phrase_index[p] for p in group] for _, _, rule_groups, _ in rules for group in rule_groups]
+    sections['rules.group_indptr'] = np.zeros(len(rules) + 1, dtype=np.int64)
+    np.cumsum([len(rule_groups) for _, _, rule_groups, _ in rules], out=sections['rules.group_indptr'][1:])
+    sections['groups.indptr'], sections['groups.phrases'] = CSR.encode(groups)
+    sections['rules.veto_indptr'], sections['rules.veto'] = CSR.encode(
+        [[phrase_index[p] for p in veto] for _, _, _, veto in rules])
+    phrase_rules = [[] for _ in phrases]
+    for priority, (_, _, rule_groups, _) in enumerate(rules):
+        for phrase in dict.fromkeys(rule_groups[0]):
+            phrase_rules[phrase_index[phrase]].append(priority)
+    sections['phrase_rules.indptr'], sections['phrase_rules.values'] = CSR.encode(phrase_rules)
+    sections['stock_phrases'] = np.asarray(sorted({phrase_index[p] for p in content['stock_keywords']}), dtype=np.int32)
+
+    # Stock knowledge base: one JSON record per concept, ranked with BM25
+    search = content['search']
+    categories = []
+    concepts = []
+    concept_category = []
+    for key, data in content['stock_knowledge_base'].items():
+        for concept in data['concepts']:
+            concepts.append(concept)
+            concept_category.append(len(categories))
+        categories.append([key, data['title']])
+    sections.update(_string_sections('concepts', [json.dumps(c, ensure_ascii=False) for c in concepts]))
+    sections.update(_string_sections('concept_titles', [c['title'] for c in concepts], hashed=True))
+    sections['concept_category'] = np.asarray(concept_category, dtype=np.int32)
+    ranker = BM25Index([(c['title'], c['definition'], ' '.join(c['characteristics'])) for c in concepts],
+                       stopwords=search['stopwords'], k1=search.get('k1', 1.5), b=search.get('b', 0.75),
+                       field_weights=search['field_weights'])
+    terms, indptr, doc_ids, weights = ranker.to_arrays()
+    sections.update(_string_sections('terms', terms, hashed=True))
+    sections.update({'postings.indptr': indptr, 'postings.doc_ids': doc_ids, 'postings.weights': weights})
+
+    # Fuzzy fallback: hashed n-gram vectors of the concepts, then of the universal knowledge topics
+    semantic = content['semantic']
+    topics = list(dict.fromkeys(rule_id for _, category_topics in content['universal_categories']
+                                for rule_id, _ in category_topics))
+    documents = [(c['title'], f"{c['definition']} {' '.join(c['characteristics'])}") for c in concepts]
+    documents += [tuple(content['intent_responses'][rule_id].split('\n', 1)) for rule_id in topics]
+    embedder = HashedNgramIndex(documents, stopwords=semantic['stopwords'], field_weights=semantic['field_weights'])
+    idf, indptr, doc_ids, weights = embedder.to_arrays()
+    sections.update({'semantic.idf': idf, 'semantic.indptr': indptr, 'semantic.doc_ids': doc_ids, 'semantic.weights': weights})
+    sections['semantic.topics'] = np.asarray([response_index[rule_id] for rule_id in topics], dtype=np.int32)
+
+    # Typo tolerance: SymSpell deletes of the routing words, then of the search terms.
+    # Any word of the content itself is taken as correctly spelled.
+    spelling = content['spelling']
+    vocabulary = [word for phrase in [*content['stock_keywords'], *phrases] for word in tokenize(phrase)] + terms
+    texts = [*phrases, *content['intent_responses'].values(), *(json.dumps(c, ensure_ascii=False) for c in concepts), *content['daily_tips']]
+    known = sorted({word for text in texts for word in tokenize(text)} | set(spelling['known_words']))
+    speller = SpellingIndex(vocabulary, known, spelling['min_length'], spelling['substitution_length'],
+                            spelling['long_length'])
+    spelling_terms, delete_keys, delete_terms, known = speller.to_arrays()
+    sections.update(_string_sections('spelling.terms', spelling_terms))
+    sections.update(_string_sections('spelling.deletes', delete_keys, hashed=True))
+    sections['spelling.indptr'], sections['spelling.term_ids'] = CSR.encode(delete_terms)
+    sections.update(_string_sections('spelling.known', known, hashed=True))
+
+    sections.update(_string_sections('daily_tips', content['daily_tips']))
+
+    header = {
+        'version': content['version'],
+        'domains': domains,
+        'universal_start': universal_start,
+        'n_rules': len(rules),
+        'categories': categories,
+        'n_docs': ranker.n_docs,
+        'search': {'stopwords': search['stopwords'], 'k1': ranker.k1, 'b': ranker.b},
+        'semantic': {'stopwords': semantic['stopwords'], 'threshold': semantic['threshold'], 'n_docs': embedder.n_docs,
+                     'char_ngrams': embedder.char_ngrams, 'word_ngrams': embedder.word_ngrams},
+        'spelling': {'min_length': speller.min_length, 'substitution_length': speller.substitution_length,
+                     'long_length': speller.long_length},
+        'fallback_responses': content['fallback_responses'],
+        'universal_default': content['universal_default'],
+    }
+    return header, sections
+
+
+def write_index(header, sections, path):
+    """Write the artifact: a fixed prefix, aligned array sections, then the JSON header"""
+    layout = {}
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp', dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'\0' * ALIGNMENT)
+            for name, array in sections.items():
+                array = np.ascontiguousarray(array)
+                f.write(b'\0' * (-f.tell() % ALIGNMENT))
+                layout[name] = [f.tell(), len(array), array.dtype.name]
+                f.write(array.tobytes())
+            header_offset = f.tell()
+            header_bytes = json.dumps(dict(header, format=INDEX_FORMAT, sections=layout), ensure_ascii=False).encode('utf-8')
+            f.write(header_bytes)
+            f.seek(0)
+            f.write(struct.pack('<8sQQ', MAGIC, header_offset, len(header_bytes)))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    os.chmod(tmp_path, 0o644)
+    # Replace atomically so a reader never maps a half-written artifact; readers
+    # that already mapped the previous file keep it until they unmap it
+    os.replace(tmp_path, path)
+
+
+def build_index(content_path, index_path):
+    """Compile content_path into index_path; returns the path actually written"""
+    with open(content_path, 'rb') as f:
+        raw = f.read()
+    stat = os.stat(content_path)
+    header, sections = compile_content(json.loads(raw))
+    header['source'] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': hashlib.sha256(raw).hexdigest()}
+    try:
+        write_index(header, sections, index_path)
+    except OSError:
+        # Read-only deployments still get a mapped index, built in the temp directory
+        fd, index_path = tempfile.mkstemp(prefix='zeno-knowledge-', suffix='.idx')
+        os.close(fd)
+        write_index(header, sections, index_path)
+    return index_path
+
+
+# Loading
+class KnowledgeSnapshot:
+    """One immutable, memory-mapped version of the knowledge content"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        magic, header_offset, header_length = struct.unpack_from('<8sQQ', self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a knowledge index")
+        header = json.loads(bytes(self._buffer[header_offset:header_offset + header_length]))
+        if header.get('format') != INDEX_FORMAT:
+            raise ValueError(f"{path} has index format {header.get('format')}, expected {INDEX_FORMAT}")
+        self.path = path
+        self.header = header
+        self.version = header['version']
+        self.source = header['source']
+        self.label = f"v{self.version} ({self.source['sha256'][:8]})"
+
+        self.response_ids = self._strings('response_ids')
+        self.response_texts = self._strings('response_texts')
+        self.phrases = self._strings('phrases')
+        self.matcher = PhraseMatcher(
+            self._view('matcher.edge_indptr'), self._view('matcher.edge_chars'),
+            self._view('matcher.edge_targets'), self._view('matcher.fail'),
+            CSR(self._view('matcher.output_indptr'), self._view('matcher.output_phrases')))
+        self.universal_start = header['universal_start']
+        self.n_rules = header['n_rules']
+        self.stock_phrases = frozenset(self._view('stock_phrases'))
+        self._rule_response = self._view('rules.response')
+        self._rule_domain = self._view('rules.domain')
+        self._rule_groups = self._view('rules.group_indptr')
+        self._groups = CSR(self._view('groups.indptr'), self._view('groups.phrases'))
+        self._vetoes = CSR(self._view('rules.veto_indptr'), self._view('rules.veto'))
+        self._phrase_rules = CSR(self._view('phrase_rules.indptr'), self._view('phrase_rules.values'))
+
+        self.categories = header['categories']
+        self.concept_titles = self._strings('concept_titles')
+        self._concepts = self._strings('concepts')
+        self._concept_category = self._view('concept_category')
+        search = header['search']
+        self.ranker = BM25Index.from_arrays(
+            self._strings('terms'), self._array('postings.indptr'), self._array('postings.doc_ids'),
+            self._array('postings.weights'), header['n_docs'], search['stopwords'], search['k1'], search['b'])
+
+        semantic = header['semantic']
+        self.embedder = HashedNgramIndex.from_arrays(
+            self._array('semantic.idf'), self._array('semantic.indptr'), self._array('semantic.doc_ids'),
+            self._array('semantic.weights'), semantic['n_docs'], semantic['stopwords'],
+            semantic['char_ngrams'], semantic['word_ngrams'])
+        self.semantic_threshold = semantic['threshold']
+        self._semantic_topics = self._view('semantic.topics')
+        self.speller = SpellingIndex.from_arrays(
+            self._strings('spelling.terms'), self._strings('spelling.deletes'),
+            CSR(self._view('spelling.indptr'), self._view('spelling.term_ids')), self._strings('spelling.known'),
+            **header['spelling'])
+
+        self.daily_tips = self._strings('daily_tips')
+        self.fallback_responses = freeze(header['fallback_responses'])
+        self.universal_default = header['universal_default']
+
+        # Entries decoded so far, and values derived from this version by other modules
+        self._rules = {}
+        self._rules_by_phrase = {}
+        self._texts = {}
+        self._concept_cache = {}
+        self._derived = {}
+        # The version this one replaced, set when it is swapped in by a reload
+        self.previous = None
+
+    def _view(self, name):
+        offset, count, dtype = self.header['sections'][name]
+        itemsize = np.dtype(dtype).itemsize
+        return self._buffer[offset:offset + count * itemsize].cast(_VIEW_FORMATS[dtype])
+
+    def _array(self, name):
+        offset, count, dtype = self.header['sections'][name]
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset)
+
+    def _strings(self, name):
+        sections = self.header['sections']
+        return StringTable(self._view(f'{name}.offsets'), self._view(f'{name}.blob'),
+                           self._view(f'{name}.slots') if f'{name}.slots' in sections else None)
+
+    def is_current(self, content_path):
+        """Whether this snapshot was compiled from the current content of content_path"""
+        stat = os.stat(content_path)
+        if (stat.st_size, stat.st_mtime_ns) == (self.source['size'], self.source['mtime_ns']):
+            return True
+        with open(content_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest() == self.source['sha256']
+
+    # Routing rules
+    def rule(self, priority):
+        """(response id, domain or None, phrase id groups, veto phrase ids) of one rule"""
+        rule = self._rules.get(priority)
+        if rule is None:
+            domain = self._rule_domain[priority]
+            groups = range(self._rule_groups[priority], self._rule_groups[priority + 1])
+            rule = self._rules[priority] = (
+                self.response_ids[self._rule_response[priority]],
+                self.header['domains'][domain] if domain >= 0 else None,
+                tuple(frozenset(self._groups[g]) for g in groups),
+                frozenset(self._vetoes[priority]))
+        return rule
+
+    def rules_for_phrase(self, phrase_id):
+        """Priorities of the rules whose first phrase group contains phrase_id"""
+        priorities = self._rules_by_phrase.get(phrase_id)
+        if priorities is None:
+            priorities = self._rules_by_phrase[phrase_id] = tuple(self._phrase_rules[phrase_id])
+        return priorities
+
+    def response_text(self, response_id):
+        text = self._texts.get(response_id)
+        if text is None:
+            position = self.response_ids.get(response_id)
+            if position is None:
+                raise KeyError(response_id)
+            text = self._texts[response_id] = self.response_texts[position]
+        return text
+
+    # Stock knowledge base
+    def concept(self, concept_id):
+        concept = self._concept_cache.get(concept_id)
+        if concept is None:
+            concept = self._concept_cache[concept_id] = freeze(json.loads(self._concepts[concept_id]))
+        return concept
+
+    def concept_by_title(self, title):
+        concept_id = self.concept_titles.get(title)
+        if concept_id is None:
+            raise KeyError(title)
+        return self.concept(concept_id)
+
+    def concept_category(self, concept_id):
+        return self.categories[self._concept_category[concept_id]][1]
+
+    def search_batch(self, queries, k=3):
+        """Top-k concept results for each query, scored in one vectorized pass"""
+        return [[{
+            'concept': self.concept(concept_id),
+            'category': self.concept_category(concept_id),
+            'relevance': score
+        } for concept_id, score in hits] for hits in self.ranker.search_batch(queries, k)]
+
+    # Fuzzy matching
+    def semantic_search_batch(self, queries, k=3):
+        """(document id, similarity) of the closest concepts and topics above the threshold, per query"""
+        return self.embedder.search_batch(queries, k, self.semantic_threshold)
+
+    def semantic_topic(self, doc_id):
+        """Response id of a topic document of the semantic index, or None for a concept (whose id is doc_id)"""
+        n_concepts = len(self.concept_titles)
+        return None if doc_id < n_concepts else self.response_ids[self._semantic_topics[doc_id - n_concepts]]
+
+    def correct_spelling(self, text):
+        """(lowercased text with misspelled words replaced by vocabulary terms, [(word, term)] corrections)"""
+        return self.speller.correct_text(text)
+
+    def fuzzy_search_batch(self, queries, k=3):
+        """Concept results like search_batch, ranked by n-gram similarity instead of word matches"""
+        return [[{
+            'concept': self.concept(doc_id),
+            'category': self.concept_category(doc_id),
+            'relevance': score
+        } for doc_id, score in hits if self.semantic_topic(doc_id) is None]
+            for hits in self.semantic_search_batch(queries, k)]
+
+    def knowledge_base(self):
+        """The whole knowledge base as {category key: {title, concepts}}, decoded on first use"""
+        def build():
+            grouped = {key: [] for key, _ in self.categories}
+            for concept_id in range(len(self._concepts)):
+                grouped[self.categories[self._concept_category[concept_id]][0]].append(self.concept(concept_id))
+            return MappingProxyType({key: MappingProxyType({'title': title, 'concepts': tuple(grouped[key])})
+                                     for key, title in self.categories})
+        return self.derived('knowledge_base', build)
+
+    def derived(self, key, compute):
+        """Value computed once per snapshot, e.g. lookup tables built by other modules"""
+        value = self._derived.get(key)
+        if value is None:
+            value = self._derived[key] = compute()
+        return value
+
+
+def load_knowledge(data_dir=DATA_DIR):
+    """Map the compiled index of data_dir, rebuilding it first if the content changed"""
+    content_path = os.path.join(data_dir, CONTENT_FILE)
+    index_path = os.path.join(data_dir, INDEX_FILE)
+    try:
+        snapshot = KnowledgeSnapshot(index_path)
+        if snapshot.is_current(content_path):
+            return snapshot
+    except (OSError, ValueError, KeyError):
+        pass
+    return KnowledgeSnapshot(build_index(content_path, index_path))
+
+
+class KnowledgeWatcher(threading.Thread):
+    """Daemon thread that recompiles the content when it changes and hands over each new snapshot
+
+    The new version is built and mapped on this thread while the old one
+    keeps serving; on_change(snapshot) then swaps it in. A content file that
+    fails to compile (e.g. caught mid-save) is reported and skipped until it
+    changes again.
+    """
+
+    def __init__(self, current, on_change, data_dir=DATA_DIR, interval=2.0):
+        super().__init__(name='knowledge-watcher', daemon=True)
+        self.current = current
+        self.on_change = on_change
+        self.content_path = os.path.join(data_dir, CONTENT_FILE)
+        self.index_path = os.path.join(data_dir, INDEX_FILE)
+        self.interval = interval
+        self._signature = (current.source['size'], current.source['mtime_ns'])
+        self._stopped = threading.Event()
+
+    def check(self):
+        """Swap in a new snapshot if the content changed since the last check; returns it, or None"""
+        stat = os.stat(self.content_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        if self.current.is_current(self.content_path):
+            return None
+        snapshot = KnowledgeSnapshot(build_index(self.content_path, self.index_path))
+        self.current = snapshot
+        self.on_change(snapshot)
+        return snapshot
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                snapshot = self.check()
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                print(f"⚠️ Could not reload knowledge from {self.content_path}: {error}")
+                continue
+            if snapshot is not None:
+                print(f"🔄 Knowledge reloaded: {snapshot.label}")
+
+    def stop(self):
+        self._stopped.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile knowledge content into its memory-mapped index')
+    parser.add_argument('action', choices=('build',))
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    args = parser.parse_args()
+
+    index_path = build_index(os.path.join(args.data_dir, CONTENT_FILE), os.path.join(args.data_dir, INDEX_FILE))
+    snapshot = KnowledgeSnapshot(index_path)
+    print(f"✅ Built knowledge index {snapshot.label}: {len(snapshot.response_ids)} responses, "
+          f"{snapshot.n_rules} rules, {len(snapshot.concept_titles)} concepts -> {index_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Bounded per-session message buffer
+Keeps the most recent messages of a conversation in memory and spills older
+ones to an append-only temporary file, paging them back in when the chat
+scrolls back. Behaves like a list of Message records for len(), iteration,
+indexing and slicing.
+"""
+
+import json
+import sys
+import tempfile
+from array import array
+from collections import deque
+
+from chat_message import Message
+
+
+def message_size(message):
+    """Approximate resident bytes of one message record"""
+    size = sys.getsizeof(message) + sys.getsizeof(message.content)
+    if message.response:
+        size += sys.getsizeof(message.response) + sum(sys.getsizeof(param) for param in message.response[1])
+    return size
+
+
+class MessageBuffer:
+    """Ring buffer of resident messages in front of an on-disk spill segment"""
+
+    def __init__(self, messages=(), max_messages=200, max_bytes=256 * 1024, spill_dir=None):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self._resident = deque()
+        self._sizes = deque()
+        self.resident_bytes = 0
+        # Spilled messages are JSON records back to back; message i spans _offsets[i]:_offsets[i + 1]
+        self._segment = None
+        self._offsets = array('Q', [0])
+        self.extend(messages)
+
+    @property
+    def spilled(self):
+        return len(self._offsets) - 1
+
+    def __len__(self):
+        return self.spilled + len(self._resident)
+
+    def __iter__(self):
+        yield from self._read_spilled(0, self.spilled)
+        yield from self._resident
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            spilled = self.spilled
+            messages = self._read_spilled(start, min(stop, spilled)) if start < spilled else []
+            resident = list(self._resident) if stop > spilled else []
+            return messages + resident[max(start - spilled, 0):stop - spilled]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('message index out of range')
+        if index >= self.spilled:
+            return self._resident[index - self.spilled]
+        return self._read_spilled(index, index + 1)[0]
+
+    def append(self, message):
+        size = message_size(message)
+        self._resident.append(message)
+        self._sizes.append(size)
+        self.resident_bytes += size
+        # Always keep the newest message resident, whatever its size
+        while len(self._resident) > 1 and (len(self._resident) > self.max_messages or self.resident_bytes > self.max_bytes):
+            self._spill()
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def clear(self):
+        self._resident.clear()
+        self._sizes.clear()
+        self.resident_bytes = 0
+        self._offsets = array('Q', [0])
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def _spill(self):
+        if self._segment is None:
+            self._segment = tempfile.TemporaryFile(prefix='zeno-messages-', dir=self.spill_dir)
+        record = json.dumps(self._resident.popleft().to_record(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.resident_bytes -= self._sizes.popleft()
+        self._segment.seek(self._offsets[-1])
+        self._segment.write(record)
+        self._offsets.append(self._offsets[-1] + len(record))
+
+    def _read_spilled(self, start, stop):
+        """Messages start:stop of the spill segment, read in one pass"""
+        if start >= stop:
+            return []
+        base = self._offsets[start]
+        self._segment.seek(base)
+        block = self._segment.read(self._offsets[stop] - base)
+        return [Message.from_record(json.loads(block[self._offsets[i] - base:self._offsets[i + 1] - base]))
+                for i in range(start, stop)]
@@ -0,0 +1,145 @@
+"""
+Process-wide latency metrics
+Fixed-bucket histograms per reply stage, cheap enough to record on every
+message, with a Prometheus text-format exporter that rewrites a file
+periodically from a background thread.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the histogram buckets, from 5 µs to 5 s
+LATENCY_BUCKETS = (
+    5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+    1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+# Stages of a reply, in the order they run
+STAGES = ('classify', 'kb_search', 'domain_cascade', 'universal_lookup', 'typo_lookup', 'semantic_lookup', 'render')
+
+
+class LatencyHistogram:
+    """Thread-safe histogram of durations in seconds"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def snapshot(self):
+        """(per-bucket counts including +Inf, total seconds)"""
+        with self._lock:
+            return list(self._counts), self._sum
+
+    def quantile(self, q, counts=None):
+        """Estimate the q-quantile by interpolating inside its bucket"""
+        if counts is None:
+            counts, _ = self.snapshot()
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class StageMetrics:
+    """Latency histograms keyed by stage name"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram())
+        return histogram
+
+    def observe(self, stage, seconds):
+        self.histogram(stage).observe(seconds)
+
+    def since(self, stage, start):
+        """Record the time elapsed since a time.perf_counter() reading"""
+        self.histogram(stage).observe(time.perf_counter() - start)
+
+    def summary(self):
+        """[{stage, count, mean_ms, p50_ms, p99_ms}] for display, known stages first"""
+        names = [s for s in STAGES if s in self._histograms]
+        names += sorted(s for s in self._histograms if s not in STAGES)
+        rows = []
+        for stage in names:
+            histogram = self._histograms[stage]
+            counts, total = histogram.snapshot()
+            count = sum(counts)
+            rows.append({
+                'stage': stage,
+                'count': count,
+                'mean_ms': total / count * 1e3 if count else 0.0,
+                'p50_ms': histogram.quantile(0.5, counts) * 1e3,
+                'p99_ms': histogram.quantile(0.99, counts) * 1e3,
+            })
+        return rows
+
+    def to_prometheus(self, name='zeno_stage_latency_seconds'):
+        lines = [f"# HELP {name} Latency of each stage of a chat reply",
+                 f"# TYPE {name} histogram"]
+        for stage in sorted(self._histograms):
+            histogram = self._histograms[stage]
+            counts, total = histogram.snapshot()
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+class PrometheusExporter(threading.Thread):
+    """Daemon thread that rewrites a Prometheus text file every interval seconds"""
+
+    def __init__(self, metrics, path, interval=15.0):
+        super().__init__(name='metrics-exporter', daemon=True)
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def write(self):
+        # Write then rename so scrapers never read a half-written file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.metrics.to_prometheus())
+        os.replace(tmp_path, self.path)
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.write()
+            except OSError as error:
+                print(f"⚠️ Could not write metrics to {self.path}: {error}")
+
+    def stop(self):
+        self._stopped.set()
+
+
+# Shared by everything in this process
+METRICS = StageMetrics()
@@ -0,0 +1,215 @@
+"""
+Portfolio risk engine
+Returns, the covariance matrix and the usual risk figures of weighted
+portfolios: volatility, Sharpe ratio, parametric (variance-covariance) and
+historical VaR, beta and each asset's contribution to risk. Returns are
+(observations x assets), i.e. dates x tickers as read_ohlcv gives them.
+Weights are one vector or a (portfolios x assets) matrix, so thousands of
+portfolios are measured in one call. A RiskModel computes the covariance
+once; cached_model() shares it across what-if queries on the same prices.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from functools import cached_property
+from statistics import NormalDist
+
+import numpy as np
+
+RiskReport = namedtuple('RiskReport', 'expected_return volatility sharpe_ratio parametric_var historical_var beta')
+RiskContributions = namedtuple('RiskContributions', 'marginal component')
+
+TRADING_DAYS = 252
+
+# Models kept by cached_model(); each holds an assets x assets covariance matrix
+MODEL_CACHE_SIZE = 4
+
+
+def returns(prices, log=False):
+    """Period returns of prices (dates x assets), one row shorter; pandas input gives pandas output
+
+    Zero or negative prices are treated as missing, so the returns next to
+    them are NaN (and left out by RiskModel) rather than infinite.
+    """
+    if hasattr(prices, 'shift'):
+        prices = prices.where(prices > 0)
+        ratio = (prices / prices.shift(1)).iloc[1:]
+    else:
+        values = np.asarray(prices, dtype=np.float64)
+        values = np.where(values > 0, values, np.nan)
+        ratio = values[1:] / values[:-1]
+    return np.log(ratio) if log else ratio - 1.0
+
+
+class RiskModel:
+    """Mean returns, covariance and asset betas of a set of assets, computed once for every query on them
+
+    Dates on which any asset (or the benchmark) has no return are left out.
+    Without a benchmark, beta is measured against the equal-weighted
+    portfolio of all the assets. Return and volatility figures are
+    annualized with periods_per_year; VaR is a loss over horizon periods,
+    as a fraction of the portfolio's value.
+    """
+
+    def __init__(self, returns, benchmark=None, periods_per_year=TRADING_DAYS, risk_free_rate=0.0):
+        data = np.asarray(returns, dtype=np.float64)
+        if data.ndim != 2:
+            raise ValueError('returns must be an (observations x assets) matrix')
+        self.assets = [str(column) for column in returns.columns] if hasattr(returns, 'columns') \
+            else [str(i) for i in range(data.shape[1])]
+        market = data.mean(axis=1) if benchmark is None else np.asarray(benchmark, dtype=np.float64)
+        if market.shape != (len(data),):
+            raise ValueError('benchmark must have one return per observation')
+        complete = ~np.isnan(data).any(axis=1) & ~np.isnan(market)
+        data, market = data[complete], market[complete]
+        if len(data) < 2:
+            raise ValueError('need at least two dates with a return for every asset')
+
+        self.returns = data
+        self.observations = len(data)
+        self.periods_per_year = periods_per_year
+        self.risk_free_rate = risk_free_rate
+        self.mean = data.mean(axis=0)
+        centred = data - self.mean
+        self.covariance = centred.T @ centred / (self.observations - 1)
+        centred_market = market - market.mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.asset_betas = centred.T @ centred_market / (centred_market @ centred_market)
+        # With more assets than dates, products through the returns matrix cost
+        # less than through the assets x assets covariance (and agree with it)
+        self._wide = len(self.assets) > self.observations
+
+    @cached_property
+    def covariance_factor(self):
+        """Matrix F with F @ F.T == covariance, for drawing correlated returns
+
+        The Cholesky factor (assets x assets) when the covariance is positive
+        definite; otherwise, e.g. with more assets than dates, the scaled
+        centred returns (assets x observations), which are an exact factor too.
+        """
+        if not self._wide:
+            try:
+                return np.linalg.cholesky(self.covariance)
+            except np.linalg.LinAlgError:
+                pass
+        return (self.returns - self.mean).T / np.sqrt(self.observations - 1)
+
+    def _weights(self, weights):
+        """(portfolios x assets) weight matrix and whether a single portfolio was given"""
+        w = np.asarray(weights, dtype=np.float64)
+        if w.ndim not in (1, 2) or w.shape[-1] != len(self.assets):
+            raise ValueError(f'weights must have {len(self.assets)} columns, one per asset')
+        return np.atleast_2d(w), w.ndim == 1
+
+    @staticmethod
+    def _shaped(values, single):
+        return values[0] if single else values
+
+    def _moments(self, w, pnl=None):
+        """Per-period mean and variance of each portfolio; pnl is its return series when already computed"""
+        if self._wide:
+            pnl = self.returns @ w.T if pnl is None else pnl
+            return pnl.mean(axis=0), pnl.var(axis=0, ddof=1)
+        return w @ self.mean, np.einsum('pi,pi->p', w @ self.covariance, w)
+
+    def _exposure(self, w):
+        """covariance @ weights for each portfolio"""
+        if self._wide:
+            pnl = self.returns @ w.T
+            return (pnl - pnl.mean(axis=0)).T @ self.returns / (self.observations - 1)
+        return w @ self.covariance
+
+    def _historical_var(self, pnl, confidence, horizon):
+        """Value at risk of return series (observations x portfolios) over overlapping horizon-period windows"""
+        if not 1 <= horizon <= self.observations:
+            raise ValueError(f'horizon must be between 1 and {self.observations} periods')
+        if horizon > 1:
+            totals = np.cumsum(pnl, axis=0)
+            pnl = totals[horizon - 1:] - np.vstack([np.zeros((1, pnl.shape[1])), totals[:-horizon]])
+        return -np.quantile(pnl, 1.0 - confidence, axis=0)
+
+    def expected_return(self, weights):
+        """Annualized mean return"""
+        w, single = self._weights(weights)
+        return self._shaped(w @ self.mean * self.periods_per_year, single)
+
+    def volatility(self, weights):
+        """Annualized standard deviation of returns"""
+        w, single = self._weights(weights)
+        return self._shaped(np.sqrt(self._moments(w)[1] * self.periods_per_year), single)
+
+    def sharpe_ratio(self, weights):
+        """Annualized excess return per unit of annualized volatility"""
+        return (self.expected_return(weights) - self.risk_free_rate) / self.volatility(weights)
+
+    def parametric_var(self, weights, confidence=0.95, horizon=1):
+        """Value at risk assuming normally distributed returns"""
+        w, single = self._weights(weights)
+        mean, variance = self._moments(w)
+        z = NormalDist().inv_cdf(confidence)
+        return self._shaped(z * np.sqrt(variance * horizon) - mean * horizon, single)
+
+    def historical_var(self, weights, confidence=0.95, horizon=1):
+        """Value at risk from the observed returns, over overlapping horizon-period windows"""
+        w, single = self._weights(weights)
+        return self._shaped(self._historical_var(self.returns @ w.T, confidence, horizon), single)
+
+    def beta(self, weights):
+        """Sensitivity of each portfolio to the benchmark"""
+        w, single = self._weights(weights)
+        return self._shaped(w @ self.asset_betas, single)
+
+    def risk_contributions(self, weights):
+        """Marginal volatility of each asset and its share of it; the components add up to the volatility"""
+        w, single = self._weights(weights)
+        exposure = self._exposure(w)
+        variance = np.einsum('pi,pi->p', exposure, w)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            marginal = exposure * np.sqrt(self.periods_per_year / variance)[:, None]
+        return RiskContributions(self._shaped(marginal, single), self._shaped(w * marginal, single))
+
+    def report(self, weights, confidence=0.95, horizon=1):
+        """Every figure at once, sharing the portfolios' return series"""
+        w, single = self._weights(weights)
+        pnl = self.returns @ w.T
+        mean, variance = self._moments(w, pnl)
+        expected = mean * self.periods_per_year
+        volatility = np.sqrt(variance * self.periods_per_year)
+        z = NormalDist().inv_cdf(confidence)
+        return RiskReport(*(self._shaped(values, single) for values in (
+            expected,
+            volatility,
+            (expected - self.risk_free_rate) / volatility,
+            z * np.sqrt(variance * horizon) - mean * horizon,
+            self._historical_var(pnl, confidence, horizon),
+            w @ self.asset_betas,
+        )))
+
+
+# Models of recently used prices
+_models = OrderedDict()
+_models_lock = threading.Lock()
+
+
+def cached_model(prices, periods_per_year=TRADING_DAYS, risk_free_rate=0.0):
+    """RiskModel of the returns of prices (dates x assets), reused while the same prices keep being asked about
+
+    Keyed by a digest of the prices, so what-if questions on one upload
+    share its covariance matrix instead of rebuilding it.
+    """
+    values = np.ascontiguousarray(prices, dtype=np.float64)
+    columns = tuple(map(str, prices.columns)) if hasattr(prices, 'columns') else None
+    key = (hashlib.blake2b(values.data, digest_size=16).digest(), values.shape, columns, periods_per_year,
+           risk_free_rate)
+    with _models_lock:
+        model = _models.get(key)
+        if model is not None:
+            _models.move_to_end(key)
+            return model
+    model = RiskModel(returns(prices), periods_per_year=periods_per_year, risk_free_rate=risk_free_rate)
+    with _models_lock:
+        _models[key] = model
+        while len(_models) > MODEL_CACHE_SIZE:
+            _models.popitem(last=False)
+    return model
@@ -0,0 +1,93 @@
+"""
+Process-wide response cache
+A thread-safe LRU mapping bounded both by entry count and by the total
+UTF-8 size of the cached keys and responses, shared by every Streamlit session.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def _utf8_size(value):
+    """UTF-8 bytes of a string, or of the strings nested in a tuple such as a response reference"""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (tuple, list)):
+        return sum(_utf8_size(part) for part in value)
+    return 0
+
+
+class ResponseCache:
+    """LRU cache of answers keyed by (knowledge version, domain, message)
+
+    Messages are keyed exactly as typed: routing and the fallback answer are
+    whitespace-sensitive, so a normalized key could serve one spelling's
+    answer for another.
+    """
+
+    def __init__(self, max_entries=2048, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(key, value):
+        return _utf8_size(key) + _utf8_size(value)
+
+    def get(self, key):
+        """Return the cached value for key (marking it recently used), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Insert value, evicting least recently used entries to respect both bounds"""
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key; on a miss compute() runs outside the lock and is stored"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Snapshot of the counters for display"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,92 @@
+"""
+Monte Carlo portfolio VaR and expected shortfall
+Simulates correlated daily asset returns (normal, drawn through the
+covariance factor of a RiskModel), compounds them over the horizon for
+buy-and-hold portfolios and reads VaR and expected shortfall off the
+simulated losses. Paths are generated in fixed-size chunks spread over a
+process pool. Each chunk draws from its own SeedSequence child and hands back
+only the tail of its losses, so the figures depend on the seed alone, not on
+the number of workers, and memory stays bounded by one chunk per worker.
+"""
+
+import math
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+SimulatedRisk = namedtuple('SimulatedRisk', 'var expected_shortfall paths')
+
+# Simulated values a chunk holds at once (about three paths x assets float64 arrays)
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# (mean, factor, weights, horizon, tail) of the simulation a pool worker runs, set once per worker
+_problem = None
+
+
+def _set_problem(problem):
+    global _problem
+    _problem = problem
+
+
+def _largest(losses, tail):
+    """The tail largest losses of each portfolio (column), unordered"""
+    if len(losses) <= tail:
+        return losses
+    return np.partition(losses, len(losses) - tail, axis=0)[-tail:]
+
+
+def _simulate_chunk(problem, seed, paths):
+    """Largest losses of each portfolio over paths simulated from seed (a SeedSequence)"""
+    mean, factor, weights, horizon, tail = problem
+    rng = np.random.default_rng(seed)
+    growth = np.ones((paths, len(mean)))
+    for _ in range(horizon):
+        growth *= 1.0 + mean + rng.standard_normal((paths, factor.shape[1])) @ factor.T
+    return _largest((1.0 - growth) @ weights.T, tail)
+
+
+def _pooled_chunk(seed, paths):
+    return _simulate_chunk(_problem, seed, paths)
+
+
+def chunk_sizes(paths, assets, chunk_paths=None):
+    """Paths per chunk; fixed by the simulation's size, never by the number of workers"""
+    chunk_paths = chunk_paths or max(1, CHUNK_BYTES // (3 * 8 * assets))
+    return [chunk_paths] * (paths // chunk_paths) + ([paths % chunk_paths] if paths % chunk_paths else [])
+
+
+def simulate_var(model, weights, confidence=0.95, horizon=1, paths=1_000_000, seed=0, workers=1, chunk_paths=None):
+    """Monte Carlo VaR and expected shortfall of buy-and-hold portfolios over horizon periods
+
+    weights is one vector or a (portfolios x assets) matrix; losses are
+    fractions of the portfolio's starting value. With workers > 1 the chunks
+    run on a process pool. The same seed and chunk size give identical
+    figures with any number of workers.
+    """
+    w = np.asarray(weights, dtype=np.float64)
+    if w.ndim not in (1, 2) or w.shape[-1] != len(model.assets):
+        raise ValueError(f'weights must have {len(model.assets)} columns, one per asset')
+    single = w.ndim == 1
+    w = np.atleast_2d(w)
+    # Losses beyond the VaR; rounded first so 1 - 0.95 does not count one path too many
+    tail = max(1, math.ceil(round(paths * (1.0 - confidence), 6)))
+    sizes = chunk_sizes(paths, len(model.assets), chunk_paths)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    problem = (model.mean, model.covariance_factor, w, horizon, tail)
+
+    # Chunks are merged in chunk order whichever worker ran them, keeping only the running tail
+    worst = None
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_set_problem, initargs=(problem,)) as pool:
+            for losses in pool.map(_pooled_chunk, seeds, sizes):
+                worst = losses if worst is None else _largest(np.concatenate([worst, losses]), tail)
+    else:
+        for chunk_seed, size in zip(seeds, sizes):
+            losses = _simulate_chunk(problem, chunk_seed, size)
+            worst = losses if worst is None else _largest(np.concatenate([worst, losses]), tail)
+
+    worst = -np.sort(-worst, axis=0)
+    var = worst[min(tail, len(worst)) - 1]
+    expected_shortfall = worst.mean(axis=0)
+    return SimulatedRisk(var[0] if single else var, expected_shortfall[0] if single else expected_shortfall, paths)